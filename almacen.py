@@ -0,0 +1,442 @@
+import json
+import os
+import sqlite3
+import threading
+from contextlib import closing, contextmanager
+from io import StringIO
+
+import numpy as np
+import pandas as pd
+
+import carga
+import compartida
+import estadistica
+import evolucion
+import jugadores
+import medicion
+import tackles
+
+
+# Almacén local (SQLite) con los datos de todas las temporadas y planteles:
+# una fila por jugador y partido en `tackles`, los totales por jugador de la
+# temporada en `totales` (se suma/resta el aporte de cada planilla que entra o
+# sale, sin reagrupar la temporada), los contadores de line, scrum,
+# salidas, penales y 22 de cada partido en `estadisticas` y las hojas de
+# Estadistica.xlsx en `hojas`. Las planillas se importan una vez (y de nuevo solo si cambian);
+# el tablero consulta únicamente la temporada/plantel que muestra.
+RUTA_DB = os.environ.get("DASHBOARD_DB", os.path.join(carga.CARPETA_CACHE, "tablero.sqlite"))
+
+# Temporada y plantel de una carpeta con las planillas sueltas (como data/).
+# Con más historia, la carpeta se organiza como data/<temporada>/<plantel>/.
+TEMPORADA = os.environ.get("DASHBOARD_TEMPORADA", "2025")
+PLANTEL = os.environ.get("DASHBOARD_PLANTEL", "TRL B")
+
+# Si cambia el esquema se rearma el almacén (es una cache: todo sale de las planillas)
+VERSION_ESQUEMA = 4
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS partidos (
+    id        INTEGER PRIMARY KEY,
+    temporada TEXT NOT NULL,
+    plantel   TEXT NOT NULL,
+    archivo   TEXT NOT NULL,
+    fecha     INTEGER,           -- número de fecha (NULL en partidos de copa)
+    codigo    TEXT,              -- código del torneo si no hay número (CHA, CRAI, ...)
+    rival     TEXT,
+    dia       TEXT,              -- YYYY-MM-DD si el nombre del archivo lo trae
+    torneo    TEXT NOT NULL,     -- Liga / Copa
+    huella    TEXT NOT NULL,
+    sumado    INTEGER NOT NULL,  -- 0: la planilla no se pudo sumar (ver error)
+    error     TEXT,              -- NULL con sumado = 0: no tiene hoja 'Resumen'; con sumado = 1: hojas de estadística
+    UNIQUE (temporada, plantel, archivo)
+);
+CREATE INDEX IF NOT EXISTS ix_partidos_fecha ON partidos (temporada, plantel, fecha);
+CREATE INDEX IF NOT EXISTS ix_partidos_rival ON partidos (temporada, plantel, rival);
+CREATE INDEX IF NOT EXISTS ix_partidos_torneo ON partidos (temporada, plantel, torneo);
+
+CREATE TABLE IF NOT EXISTS jugadores (
+    id     INTEGER PRIMARY KEY,
+    nombre TEXT NOT NULL UNIQUE
+);
+
+CREATE TABLE IF NOT EXISTS tackles (
+    partido   INTEGER NOT NULL REFERENCES partidos (id) ON DELETE CASCADE,
+    jugador   INTEGER NOT NULL REFERENCES jugadores (id),
+    camiseta  INTEGER,
+    tackles   INTEGER NOT NULL,
+    errados   INTEGER NOT NULL,
+    positivos INTEGER NOT NULL,
+    neutrales INTEGER NOT NULL,
+    negativos INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_tackles_partido ON tackles (partido);
+CREATE INDEX IF NOT EXISTS ix_tackles_jugador ON tackles (jugador, partido);
+
+-- Totales por jugador de la temporada/plantel, mantenidos en importar()
+CREATE TABLE IF NOT EXISTS totales (
+    temporada TEXT NOT NULL,
+    plantel   TEXT NOT NULL,
+    jugador   INTEGER NOT NULL REFERENCES jugadores (id),
+    tackles   INTEGER NOT NULL,
+    errados   INTEGER NOT NULL,
+    positivos INTEGER NOT NULL,
+    neutrales INTEGER NOT NULL,
+    negativos INTEGER NOT NULL,
+    PJ        INTEGER NOT NULL,
+    PRIMARY KEY (temporada, plantel, jugador)
+);
+
+-- Contadores por partido de las hojas de estadística (ver estadistica.py)
+CREATE TABLE IF NOT EXISTS estadisticas (
+    partido INTEGER NOT NULL REFERENCES partidos (id) ON DELETE CASCADE,
+    hoja    TEXT NOT NULL,
+    clave   TEXT NOT NULL,       -- situacion|motivo en 'Penales', rival en 'Efectividad 22', '' en el resto
+    columna TEXT NOT NULL,
+    valor   INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_estadisticas_partido ON estadisticas (partido);
+
+CREATE TABLE IF NOT EXISTS hojas (
+    temporada TEXT NOT NULL,
+    plantel   TEXT NOT NULL,
+    hoja      TEXT NOT NULL,
+    posicion  INTEGER NOT NULL,
+    huella    TEXT NOT NULL,
+    datos     TEXT NOT NULL,     -- DataFrame en JSON (orient="split")
+    PRIMARY KEY (temporada, plantel, hoja)
+);
+
+-- Sube cada vez que cambia algo de la temporada/plantel (clave de las caches)
+CREATE TABLE IF NOT EXISTS versiones (
+    temporada TEXT NOT NULL,
+    plantel   TEXT NOT NULL,
+    version   INTEGER NOT NULL,
+    PRIMARY KEY (temporada, plantel)
+);
+"""
+
+_lock_escritura = threading.Lock()
+_inicializadas = set()
+_hilo = threading.local()
+
+
+def _inicializar(ruta):
+    if ruta not in _inicializadas:
+        if os.path.dirname(ruta):
+            os.makedirs(os.path.dirname(ruta), exist_ok=True)
+        with closing(sqlite3.connect(ruta)) as con:
+            con.execute("PRAGMA journal_mode=WAL")
+            if con.execute("PRAGMA user_version").fetchone()[0] != VERSION_ESQUEMA:
+                con.executescript("DROP TABLE IF EXISTS totales; DROP TABLE IF EXISTS tackles; DROP TABLE IF EXISTS estadisticas; "
+                                  "DROP TABLE IF EXISTS partidos; DROP TABLE IF EXISTS jugadores; "
+                                  "DROP TABLE IF EXISTS hojas; DROP TABLE IF EXISTS versiones;")
+            con.executescript(ESQUEMA + f"PRAGMA user_version = {VERSION_ESQUEMA};")
+        _inicializadas.add(ruta)
+
+
+@contextmanager
+def conectar(ruta=None):
+    """Conexión nueva para escribir (una transacción por llamada)."""
+    ruta = ruta or RUTA_DB
+    _inicializar(ruta)
+    with closing(sqlite3.connect(ruta, timeout=30)) as con:
+        con.execute("PRAGMA foreign_keys=ON")
+        with con:
+            yield con
+
+
+def lectura(ruta=None):
+    """Conexión de lectura del hilo actual, reutilizada entre consultas (sqlite3 no comparte conexiones entre hilos)."""
+    ruta = ruta or RUTA_DB
+    conexiones = getattr(_hilo, "conexiones", None)
+    if conexiones is None:
+        conexiones = _hilo.conexiones = {}
+    con = conexiones.get(ruta)
+    if con is None:
+        _inicializar(ruta)
+        # Autocommit: cada SELECT ve lo último que se importó
+        con = conexiones[ruta] = sqlite3.connect(ruta, timeout=30, isolation_level=None)
+    return con
+
+
+def carpetas(raiz):
+    """{(temporada, plantel): carpeta} con planillas en `raiz`.
+
+    Planillas sueltas en `raiz` -> (TEMPORADA, PLANTEL); además raiz/<temporada>/<plantel>/.
+    """
+    encontradas = {}
+    if not os.path.isdir(raiz):
+        return encontradas
+    if _tiene_datos(raiz):
+        encontradas[(TEMPORADA, PLANTEL)] = raiz
+    for temporada in sorted(os.listdir(raiz)):
+        dir_temporada = os.path.join(raiz, temporada)
+        if not os.path.isdir(dir_temporada) or temporada.startswith("."):
+            continue
+        for plantel in sorted(os.listdir(dir_temporada)):
+            carpeta = os.path.join(dir_temporada, plantel)
+            if os.path.isdir(carpeta) and _tiene_datos(carpeta):
+                encontradas[(temporada, plantel)] = carpeta
+    return encontradas
+
+
+def _tiene_datos(carpeta):
+    return any(a.endswith(".xlsx") for a in os.listdir(carpeta))
+
+
+def _texto_huella(h, h_alias=None):
+    return json.dumps([list(h), list(h_alias) if h_alias else None])
+
+
+def _subir_version(con, temporada, plantel):
+    con.execute(
+        "INSERT INTO versiones (temporada, plantel, version) VALUES (?, ?, 1) "
+        "ON CONFLICT (temporada, plantel) DO UPDATE SET version = version + 1",
+        (temporada, plantel),
+    )
+
+
+def importar(carpeta, temporada=TEMPORADA, plantel=PLANTEL, ruta=None):
+    """Pasa al almacén las planillas nuevas o modificadas de `carpeta`.
+
+    Devuelve [(archivo, error)] de las planillas que no se pudieron sumar
+    (error None = no tiene hoja 'Resumen') y de las que se sumaron con problemas en sus hojas de estadística.
+    """
+    archivos = carga.archivos_partidos(carpeta)
+    ruta_alias = os.path.join(carpeta, jugadores.ARCHIVO_ALIAS)
+    h_alias = carga.huella(ruta_alias) if os.path.exists(ruta_alias) else None
+    huellas = {os.path.basename(a): _texto_huella(carga.huella(a), h_alias) for a in archivos}
+    archivo_estadistica = os.path.join(carpeta, "Estadistica.xlsx")
+
+    with _lock_escritura, conectar(ruta) as con:
+        guardadas = dict(con.execute("SELECT archivo, huella FROM partidos WHERE temporada = ? AND plantel = ?",
+                                     (temporada, plantel)))
+        viejos = [a for a, h in guardadas.items() if huellas.get(a) != h]
+        nuevos = [a for a in archivos if guardadas.get(os.path.basename(a)) != huellas[os.path.basename(a)]]
+        if viejos:
+            # Se resta el aporte de las planillas que cambiaron o ya no están
+            ids = [i for i, in con.execute(
+                f"SELECT id FROM partidos WHERE temporada = ? AND plantel = ? AND archivo IN ({','.join('?' * len(viejos))})",
+                (temporada, plantel, *viejos))]
+            _sumar_totales(con, ids, temporada, plantel, -1)
+        con.executemany("DELETE FROM partidos WHERE temporada = ? AND plantel = ? AND archivo = ?",
+                        [(temporada, plantel, a) for a in viejos])
+        if nuevos:
+            with medicion.etapa("almacen:importar", archivos=len(nuevos)):
+                ids = _importar_partidos(con, nuevos, huellas, jugadores.leer_alias(ruta_alias), temporada, plantel)
+                _sumar_totales(con, ids, temporada, plantel, 1)
+        cambio_hojas = _importar_hojas(con, archivo_estadistica, temporada, plantel)
+        if viejos or nuevos or cambio_hojas:
+            _subir_version(con, temporada, plantel)
+        problemas = con.execute(
+            "SELECT archivo, error FROM partidos WHERE temporada = ? AND plantel = ?"
+            " AND (sumado = 0 OR error IS NOT NULL) ORDER BY archivo",
+            (temporada, plantel),
+        ).fetchall()
+    return [(os.path.join(carpeta, a), error) for a, error in problemas]
+
+
+def _importar_partidos(con, archivos, huellas, alias, temporada, plantel):
+    """Inserta las planillas; devuelve los ids de los partidos sumados."""
+    indice = jugadores.IndiceJugadores(alias)
+    sumados = []
+    for archivo, resumen, error in carga.leer_resumenes(archivos):
+        base = os.path.basename(archivo)
+        filas, contadores = None, []
+        if error is None and resumen is not None:
+            try:
+                filas, nombres = tackles.filas_partido(resumen)
+            except ValueError as e:
+                error = str(e)
+        if filas is not None:
+            # Hojas de line/scrum/salidas/penales/22 del partido, si la planilla las trae.
+            # Si tienen problemas se avisa, pero los tackles se suman igual.
+            try:
+                contadores = estadistica.filas_partido(carga.leer_hojas(archivo, estadistica.HOJAS),
+                                                       evolucion.etiqueta_partido(base))
+            except ValueError as e:
+                error = str(e)
+        partido = evolucion.datos_partido(archivo)
+        id_partido = con.execute(
+            "INSERT INTO partidos (temporada, plantel, archivo, fecha, codigo, rival, dia, torneo, huella, sumado, error) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (temporada, plantel, base, partido["fecha"], partido["codigo"], partido["rival"], partido["dia"],
+             partido["torneo"], huellas[base], filas is not None, error),
+        ).lastrowid
+        if filas is None:
+            continue
+        sumados.append(id_partido)
+        con.executemany("INSERT INTO estadisticas (partido, hoja, clave, columna, valor) VALUES (?, ?, ?, ?, ?)",
+                        [(id_partido, *c) for c in contadores])
+        ids = indice.ids(pd.Series(nombres, dtype=object))
+        con_nombre = ids >= 0
+        filas = filas[con_nombre]
+        ids_db = _ids_jugadores(con, indice.nombres_de(ids[con_nombre]))
+        camisetas = filas["camiseta"].astype(object).where(filas["camiseta"].notna(), None)
+        con.executemany(
+            "INSERT INTO tackles (partido, jugador, camiseta, tackles, errados, positivos, neutrales, negativos) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            zip([id_partido] * len(filas), ids_db.tolist(), camisetas.tolist(),
+                *(filas[c].astype(int).tolist() for c in tackles.COLUMNAS_TACKLES)),
+        )
+    return sumados
+
+
+def _sumar_totales(con, ids_partidos, temporada, plantel, signo):
+    """Suma (signo 1) o resta (-1) en `totales` el aporte por jugador de esos partidos."""
+    if not ids_partidos:
+        return
+    columnas = tackles.COLUMNAS_TACKLES + ["PJ"]
+    aporte = con.execute(
+        "SELECT jugador, " + ", ".join(f"SUM({c})" for c in tackles.COLUMNAS_TACKLES) + ", COUNT(*) FROM tackles"
+        f" WHERE partido IN ({','.join('?' * len(ids_partidos))}) GROUP BY jugador", ids_partidos,
+    ).fetchall()
+    con.executemany(
+        f"INSERT INTO totales (temporada, plantel, jugador, {', '.join(columnas)})"
+        f" VALUES (?, ?, ?, {', '.join('?' * len(columnas))})"
+        " ON CONFLICT (temporada, plantel, jugador) DO UPDATE SET "
+        + ", ".join(f"{c} = {c} + excluded.{c}" for c in columnas),
+        [(temporada, plantel, jugador, *(signo * v for v in valores)) for jugador, *valores in aporte],
+    )
+    con.execute("DELETE FROM totales WHERE temporada = ? AND plantel = ? AND PJ <= 0", (temporada, plantel))
+
+
+def _ids_jugadores(con, nombres):
+    unicos = list(dict.fromkeys(nombres))
+    con.executemany("INSERT OR IGNORE INTO jugadores (nombre) VALUES (?)", [(n,) for n in unicos])
+    marcas = ",".join("?" * len(unicos))
+    ids = dict((n, i) for i, n in con.execute(f"SELECT id, nombre FROM jugadores WHERE nombre IN ({marcas})", unicos))
+    return np.array([ids[n] for n in nombres], dtype=np.int64)
+
+
+def _importar_hojas(con, ruta, temporada, plantel):
+    h = _texto_huella(carga.huella(ruta)) if os.path.exists(ruta) else None
+    guardada = con.execute("SELECT huella FROM hojas WHERE temporada = ? AND plantel = ? LIMIT 1",
+                           (temporada, plantel)).fetchone()
+    if (guardada[0] if guardada else None) == h:
+        return False
+    con.execute("DELETE FROM hojas WHERE temporada = ? AND plantel = ?", (temporada, plantel))
+    if h is not None:
+        con.executemany(
+            "INSERT INTO hojas (temporada, plantel, hoja, posicion, huella, datos) VALUES (?, ?, ?, ?, ?, ?)",
+            [(temporada, plantel, hoja, i, h, df.to_json(orient="split", index=False, date_format="iso"))
+             for i, (hoja, df) in enumerate(carga.leer_estadistica(ruta).items())],
+        )
+    return True
+
+
+# Consultas por temporada/plantel. Los resultados van a la cache compartida del
+# proceso, agrupados por temporada/plantel y con la versión del almacén (se
+# rehacen solo cuando se importa algo de esa temporada/plantel).
+
+
+def temporadas(ruta=None):
+    """[(temporada, plantel)] guardados en el almacén, de la más nueva a la más vieja."""
+    return lectura(ruta).execute("SELECT temporada, plantel FROM versiones ORDER BY temporada DESC, plantel").fetchall()
+
+
+def version(temporada=TEMPORADA, plantel=PLANTEL, ruta=None):
+    fila = lectura(ruta).execute("SELECT version FROM versiones WHERE temporada = ? AND plantel = ?",
+                                 (temporada, plantel)).fetchone()
+    return (ruta or RUTA_DB, temporada, plantel, fila[0] if fila else 0)
+
+
+def _memo(nombre, temporada, plantel, ruta, consulta, extra=None, con_db=True):
+    """Resultado de `consulta(con)` en la cache compartida (`consulta()` sin conexión si con_db=False)."""
+    def cargar():
+        with medicion.etapa(f"almacen:{nombre}"):
+            return consulta(lectura(ruta)) if con_db else consulta()
+    return compartida.obtener((temporada, plantel), (nombre, ruta or RUTA_DB, extra), cargar,
+                              version=version(temporada, plantel, ruta), nombre="almacen")
+
+
+def partidos(temporada=TEMPORADA, plantel=PLANTEL, ruta=None):
+    """Índice de partidos sumados, en orden de fecha: fecha, código, rival, día, torneo y etiqueta por archivo."""
+    def consulta(con):
+        df = pd.read_sql_query(
+            "SELECT archivo, fecha, codigo, rival, dia, torneo FROM partidos"
+            " WHERE temporada = ? AND plantel = ? AND sumado = 1",
+            con, params=(temporada, plantel),
+        ).set_index("archivo")
+        df = df.reindex(evolucion.orden_partidos(df.index.tolist()))
+        df["fecha"] = df["fecha"].astype("Int64")
+        df["etiqueta"] = [evolucion.etiqueta_partido(a) for a in df.index]
+        return df
+    return _memo("partidos", temporada, plantel, ruta, consulta).copy()
+
+
+def hechos(temporada=TEMPORADA, plantel=PLANTEL, ruta=None):
+    """Tabla de hechos (tackles.ESQUEMA_HECHOS) de la temporada/plantel. Compartida: no modificarla."""
+    def consulta(con):
+        df = pd.read_sql_query(
+            "SELECT p.archivo, t.jugador, j.nombre, t.camiseta, "
+            + ", ".join(f"t.{c}" for c in tackles.COLUMNAS_TACKLES)
+            + " FROM tackles t JOIN partidos p ON p.id = t.partido JOIN jugadores j ON j.id = t.jugador"
+            " WHERE p.temporada = ? AND p.plantel = ? ORDER BY p.archivo, t.rowid",
+            con, params=(temporada, plantel),
+        )
+        nombres = df.drop_duplicates("jugador").sort_values("jugador")
+        df["partido"] = pd.Categorical(df["archivo"], categories=df["archivo"].unique())
+        df["nombre del jugador"] = pd.Categorical(df["nombre"], categories=nombres["nombre"].tolist())
+        df = df.rename(columns={"jugador": "id_jugador"})
+        return df[list(tackles.ESQUEMA_HECHOS)].astype(tackles.ESQUEMA_HECHOS)
+    return _memo("hechos", temporada, plantel, ruta, consulta)
+
+
+def df_sumado(temporada=TEMPORADA, plantel=PLANTEL, ruta=None):
+    """Totales por jugador (id, nombre, contadores, PJ, total, % y etiqueta). Devuelve una copia."""
+    def consulta(con):
+        df = pd.read_sql_query(
+            "SELECT t.jugador AS id_jugador, j.nombre AS \"nombre del jugador\", "
+            + ", ".join(f"t.{c}" for c in tackles.COLUMNAS_TACKLES)
+            + ", t.PJ FROM totales t JOIN jugadores j ON j.id = t.jugador"
+            " WHERE t.temporada = ? AND t.plantel = ?",
+            con, params=(temporada, plantel),
+        )
+        return tackles.completar_sumado(df)
+    return _memo("df_sumado", temporada, plantel, ruta, consulta).copy()
+
+
+def agregado(temporada=TEMPORADA, plantel=PLANTEL, ruta=None):
+    """estadistica.AgregadoEstadistica con los contadores de cada partido sumado. Compartido: no modificarlo."""
+    def consulta(con):
+        filas = con.execute(
+            "SELECT p.archivo, e.hoja, e.clave, e.columna, e.valor FROM estadisticas e"
+            " JOIN partidos p ON p.id = e.partido WHERE p.temporada = ? AND p.plantel = ? AND p.sumado = 1"
+            " ORDER BY e.rowid",
+            (temporada, plantel),
+        ).fetchall()
+        # Todos los partidos sumados, aunque no traigan hojas de estadística
+        por_partido = {a: [] for a, in con.execute(
+            "SELECT archivo FROM partidos WHERE temporada = ? AND plantel = ? AND sumado = 1", (temporada, plantel))}
+        for archivo, *fila in filas:
+            por_partido[archivo].append(fila)
+        resultado = estadistica.AgregadoEstadistica()
+        for archivo in evolucion.orden_partidos(list(por_partido)):
+            resultado.agregar(archivo, por_partido[archivo])
+        return resultado
+    return _memo("agregado", temporada, plantel, ruta, consulta)
+
+
+def hojas_de_partidos(temporada=TEMPORADA, plantel=PLANTEL, ruta=None, partidos=None):
+    """Hojas que hojas() suma de las planillas de partido (el resto son totales de la temporada)."""
+    return agregado(temporada, plantel, ruta).hojas_de_partidos(partidos)
+
+
+def hojas(temporada=TEMPORADA, plantel=PLANTEL, ruta=None, partidos=None):
+    """Hojas de Estadistica.xlsx de la temporada/plantel ({} si no hay). Devuelve copias.
+
+    Los totales (line, scrum, salidas, penales, 22) se derivan de las filas por
+    partido; con `partidos` se suman solo esos en las hojas de hojas_de_partidos().
+    """
+    def consulta(con):
+        filas = con.execute("SELECT hoja, datos FROM hojas WHERE temporada = ? AND plantel = ? ORDER BY posicion",
+                            (temporada, plantel)).fetchall()
+        return {hoja: pd.read_json(StringIO(datos), orient="split") for hoja, datos in filas}
+    crudas = _memo("hojas", temporada, plantel, ruta, consulta)
+    if not crudas:
+        return {}
+    derivadas = _memo("hojas_derivadas", temporada, plantel, ruta,
+                      lambda: agregado(temporada, plantel, ruta).hojas(partidos, crudas),
+                      extra=None if partidos is None else tuple(partidos), con_db=False)
+    return {nombre: df.copy() for nombre, df in derivadas.items()}
@@ -0,0 +1,167 @@
+"""Benchmark por etapa del pipeline (ingesta, normalización, agrupado, figuras, PDF) sobre datos sintéticos.
+
+Uso: python benchmarks/bench_pipeline.py [--partidos 16 64 256] [--jugadores 40] [--salida bench.json]
+                                         [--datos CARPETA] [--sin-pdf] [--comparar base.json]
+
+Escribe un JSON con una entrada por escala y los segundos de cada etapa, para
+comparar entre versiones (--comparar imprime el cociente contra otro JSON).
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import pandas as pd
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import almacen  # noqa: E402
+import carga  # noqa: E402
+import compartida  # noqa: E402
+import graficos  # noqa: E402
+import informe  # noqa: E402
+import jugadores  # noqa: E402
+from generar_datos import generar_temporada  # noqa: E402
+
+
+def medir(fn, repeticiones=1):
+    """(mejor tiempo en segundos, resultado de la última corrida)."""
+    mejor, res = float("inf"), None
+    for _ in range(repeticiones):
+        t0 = time.perf_counter()
+        res = fn()
+        mejor = min(mejor, time.perf_counter() - t0)
+    return mejor, res
+
+
+def version():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=RAIZ,
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def medir_carpeta(carpeta, repeticiones=3, con_pdf=True):
+    archivos = carga.archivos_partidos(carpeta)
+    etapas = {}
+    with tempfile.TemporaryDirectory() as cache:
+        carga.CARPETA_CACHE = cache
+        informe.CARPETA_PNG = os.path.join(cache, "png")
+
+        # Ingesta: en frío (parsea los .xlsx y escribe parquet) y con la cache ya armada
+        etapas["ingesta_fria"], leidos = medir(lambda: carga.leer_resumenes(archivos, procesos=1))
+        etapas["ingesta_paralela_fria"] = None
+        if len(archivos) >= 2 and (os.cpu_count() or 1) > 1:
+            for f in os.listdir(cache):
+                os.remove(os.path.join(cache, f))
+            etapas["ingesta_paralela_fria"], _ = medir(lambda: carga.leer_resumenes(archivos, procesos=os.cpu_count()))
+        etapas["ingesta_cache"], _ = medir(lambda: carga.leer_resumenes(archivos, procesos=1), repeticiones)
+        resumenes = [(a, r) for a, r, e in leidos if r is not None and e is None]
+
+        nombres = pd.concat([r["nombre del jugador"] for _, r in resumenes], ignore_index=True)
+        etapas["normalizacion"], _ = medir(lambda: jugadores.IndiceJugadores().ids(nombres), repeticiones)
+
+        # Agrupado: importación al almacén (con los Resumen ya en cache) y consultas, en un almacén nuevo
+        corridas = iter(range(repeticiones))
+
+        def agrupar():
+            ruta = os.path.join(cache, f"almacen_{next(corridas)}.sqlite")
+            compartida.cache.limpiar()
+            almacen.importar(carpeta, ruta=ruta)
+            return almacen.df_sumado(ruta=ruta), almacen.hechos(ruta=ruta)
+        etapas["agrupado"], (df_sumado, hechos) = medir(agrupar, repeticiones)
+
+        archivo_est = os.path.join(carpeta, "Estadistica.xlsx")
+        etapas["estadistica"], hojas = medir(lambda: carga.leer_estadistica(archivo_est))
+        datos = {"hojas": hojas, "df_sumado": df_sumado, "hechos": hechos}
+
+        # Sin huellas: se construyen siempre, sin pasar por la cache de figuras
+        etapas["figuras"], figs = medir(
+            lambda: graficos.Figuras(datos).varias(graficos.FIGURAS_INFORME), repeticiones)
+
+        etapas["pdf_frio"] = etapas["pdf_cache"] = None
+        error_pdf = None
+        if con_pdf:
+            kwargs = informe.argumentos_informe(hojas, df_sumado)
+            try:
+                etapas["pdf_frio"], _ = medir(lambda: informe.generar_informe_pdf(figs=figs, **kwargs))
+                etapas["pdf_cache"], _ = medir(lambda: informe.generar_informe_pdf(figs=figs, **kwargs), repeticiones)
+            except Exception as e:
+                # Sin Chromium para Kaleido, por ejemplo
+                error_pdf = str(e)
+            finally:
+                informe.cerrar_pool()
+    return {
+        "partidos": len(archivos),
+        "filas_jugador_partido": int(len(hechos)),
+        "jugadores": int(len(df_sumado)),
+        "etapas": {k: (round(v, 6) if v is not None else None) for k, v in etapas.items()},
+        "error_pdf": error_pdf,
+    }
+
+
+def comparar(actual, base):
+    escalas_base = {r["partidos"]: r["etapas"] for r in base["resultados"]}
+    print(f"\ncomparado con {base.get('version')} ({base.get('fecha')}):")
+    for r in actual["resultados"]:
+        previas = escalas_base.get(r["partidos"])
+        if previas is None:
+            continue
+        for etapa, seg in r["etapas"].items():
+            if seg and previas.get(etapa):
+                print(f"{r['partidos']:>6} {etapa:<22} {previas[etapa]:>9.3f}s -> {seg:>9.3f}s  x{seg / previas[etapa]:.2f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark por etapa del pipeline del tablero.")
+    parser.add_argument("--partidos", type=int, nargs="+", default=[16, 64, 256])
+    parser.add_argument("--jugadores", type=int, default=40)
+    parser.add_argument("--repeticiones", type=int, default=3)
+    parser.add_argument("--datos", help="medir una carpeta existente en lugar de generar datos")
+    parser.add_argument("--sin-pdf", action="store_true", help="no medir el render del PDF")
+    parser.add_argument("--salida", default="bench_pipeline.json")
+    parser.add_argument("--comparar", help="JSON de una corrida anterior")
+    args = parser.parse_args(argv)
+
+    resultados = []
+    with tempfile.TemporaryDirectory() as tmp:
+        carpetas = [args.datos] if args.datos else []
+        for n in ([] if args.datos else args.partidos):
+            carpeta = os.path.join(tmp, f"p{n}")
+            generar_temporada(carpeta, partidos=n, jugadores=args.jugadores)
+            carpetas.append(carpeta)
+        for carpeta in carpetas:
+            r = medir_carpeta(carpeta, args.repeticiones, not args.sin_pdf)
+            resultados.append(r)
+            etapas = "  ".join(f"{k}={v:.3f}s" for k, v in r["etapas"].items() if v is not None)
+            print(f"{r['partidos']:>6} partidos, {r['filas_jugador_partido']} filas: {etapas}")
+            if r["error_pdf"]:
+                print(f"       PDF omitido: {r['error_pdf'][:120]}")
+
+    salida = {
+        "version": version(),
+        "fecha": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "plataforma": platform.platform(),
+        "cpus": os.cpu_count(),
+        "parametros": {"jugadores": args.jugadores, "repeticiones": args.repeticiones, "datos": args.datos},
+        "resultados": resultados,
+    }
+    with open(args.salida, "w", encoding="utf-8") as f:
+        json.dump(salida, f, indent=2, ensure_ascii=False)
+    print(f"resultados en {args.salida}")
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as f:
+            comparar(salida, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
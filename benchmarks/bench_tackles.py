@@ -0,0 +1,109 @@
+"""Benchmark del pipeline de tackles: versión fila a fila (apply/iterrows) vs vectorizada.
+
+Uso: python benchmarks/bench_tackles.py [filas ...]
+"""
+import os
+import random
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import jugadores  # noqa: E402
+import tackles  # noqa: E402
+
+NOMBRES = ["José", "Martín", "Ñandú", "Iñaki", "Lucas", "Tomás", "Joaquín", "Agustín", "Nicolás", "Mateo"]
+APELLIDOS = ["Pérez", "GÓMEZ", "gonzález", "Fernández", "López", "Díaz", "Álvarez", "Romero", "Suárez", "Muñoz"]
+
+
+def datos_sinteticos(filas, semilla=0):
+    rnd = random.Random(semilla)
+    nombres = [f"  {rnd.choice(NOMBRES)}   {rnd.choice(APELLIDOS)} {i % 97} " for i in range(filas)]
+    nombres = [n if i % 50 else None for i, n in enumerate(nombres)]
+    gen = np.random.default_rng(semilla)
+    df = pd.DataFrame({
+        "jugador": [str(1 + i % 25) for i in range(filas)],
+        "nombre del jugador": nombres,
+    })
+    for col in tackles.COLUMNAS_TACKLES:
+        df[col] = gen.integers(0, 12, filas)
+    df.loc[::7, "tackles"] = 0
+    return df
+
+
+# Implementación anterior, fila a fila
+def normalizar_filas(s):
+    return s.apply(tackles.normalizar_texto)
+
+
+def etiquetas_filas(df):
+    df = df.copy()
+    df["total"] = df["tackles"] + df["errados"]
+    df["porcentaje"] = df.apply(
+        lambda row: (row["tackles"] / row["total"] * 100) if row["total"] > 0 else 0, axis=1
+    ).round(0).astype(int)
+    df["etiqueta"] = df.apply(
+        lambda row: f'{row["tackles"]}/{row["total"]} ({row["porcentaje"]}%)' if row["total"] > 0 else '',
+        axis=1
+    )
+    return df
+
+
+def etiquetas_vector(df):
+    df = df.copy()
+    df["total"] = df["tackles"] + df["errados"]
+    jugados = df["total"] > 0
+    df["porcentaje"] = (df["tackles"] / df["total"].where(jugados) * 100).fillna(0).round(0).astype(int)
+    df["etiqueta"] = np.where(
+        jugados,
+        df["tackles"].astype(str) + "/" + df["total"].astype(str) + " (" + df["porcentaje"].astype(str) + "%)",
+        "",
+    )
+    return df
+
+
+def anotaciones_filas(df):
+    return [dict(x=float(r["total"]) + 0.5, y=r["nombre del jugador"], text=str(r["etiqueta"])) for _, r in df.iterrows()]
+
+
+def anotaciones_vector(df):
+    return [dict(x=x, y=y, text=t) for x, y, t in zip((df["total"].astype(float) + 0.5).tolist(),
+                                                      df["nombre del jugador"].tolist(),
+                                                      df["etiqueta"].astype(str).tolist())]
+
+
+def medir(fn, *args, repeticiones=3):
+    mejor = float("inf")
+    for _ in range(repeticiones):
+        t0 = time.perf_counter()
+        res = fn(*args)
+        mejor = min(mejor, time.perf_counter() - t0)
+    return mejor, res
+
+
+def main(tamanios):
+    print(f"{'filas':>8} {'etapa':<14} {'fila a fila':>12} {'vectorizado':>12} {'x':>7}")
+    for n in tamanios:
+        df = datos_sinteticos(n)
+        etapas = [
+            ("normalizar", normalizar_filas, lambda s: jugadores.IndiceJugadores().normalizar(s), df["nombre del jugador"]),
+            ("etiquetas", etiquetas_filas, etiquetas_vector, df),
+            ("anotaciones", anotaciones_filas, anotaciones_vector, etiquetas_vector(df).assign(
+                **{"nombre del jugador": df["nombre del jugador"].fillna("")})),
+        ]
+        for nombre, lento, rapido, entrada in etapas:
+            t_lento, r_lento = medir(lento, entrada)
+            t_rapido, r_rapido = medir(rapido, entrada)
+            if isinstance(r_lento, pd.Series):
+                assert r_lento.astype(str).tolist() == r_rapido.astype(str).tolist(), nombre
+            elif isinstance(r_lento, pd.DataFrame):
+                pd.testing.assert_frame_equal(r_lento, r_rapido, check_dtype=False)
+            else:
+                assert r_lento == r_rapido, nombre
+            print(f"{n:>8} {nombre:<14} {t_lento * 1000:>10.1f}ms {t_rapido * 1000:>10.1f}ms {t_lento / t_rapido:>6.1f}x")
+
+
+if __name__ == "__main__":
+    main([int(a) for a in sys.argv[1:]] or [500, 5000, 50000])
@@ -0,0 +1,184 @@
+"""Genera planillas sintéticas con la estructura de data/ para medir el tablero a escala.
+
+Uso: python benchmarks/generar_datos.py SALIDA [--partidos 16] [--jugadores 40] [--temporadas 1]
+
+Con --temporadas > 1 se crea una carpeta por temporada (SALIDA/temporada_1, ...),
+cada una con sus Tackles_Fecha*_*.xlsx y su Estadistica.xlsx.
+"""
+import argparse
+import os
+import random
+
+import numpy as np
+import pandas as pd
+
+NOMBRES = ["José", "Martín", "Nicolás", "Tomás", "Joaquín", "Agustín", "Lucas", "Mateo", "Iñaki", "Julián",
+           "Ignacio", "Santiago", "Facundo", "Gonzalo", "Federico", "Emiliano", "Valentín", "Bautista"]
+APELLIDOS = ["Pérez", "Gómez", "González", "Fernández", "López", "Díaz", "Álvarez", "Romero", "Suárez", "Muñoz",
+             "Benítez", "Galeano", "Olmedo", "Núñez", "Juárez", "Sala", "Meza", "Redondo", "Carughi", "Haas"]
+RIVALES = ["UniR", "GEP", "Caranchos", "Alma", "Logaritmo", "Provincial", "Crar", "Tilcara", "CSF", "Duendes"]
+MOTIVOS = {
+    "Scrum": ["Derrumbe de scrum", "Pilar entra cruzado", "Explota la primera linea", "Se desarma antes", "Otro (scrum)"],
+    "Ruck": ["Retener Pelota", "Pesca indevida", "Estorbar el juego", "Entrar por el costado", "Offside", "Otro (ruck)"],
+    "Juego": ["Defensa en offside", "Tackle alto", "Tackle peligroso", "Offside en kick", "Inconducta", "Otro (juego)"],
+}
+TIPOS_TACKLE = ["POSITIVO", "NEUTRAL", "NEGATIVO", "ERRADO"]
+
+
+def plantel(n, rnd):
+    usados, nombres = set(), []
+    while len(nombres) < n:
+        nombre = f"{rnd.choice(NOMBRES)} {rnd.choice(APELLIDOS)}"
+        if nombre not in usados:
+            usados.add(nombre)
+            nombres.append(nombre)
+    return nombres
+
+
+def variante(nombre, rnd):
+    # Como en las planillas reales: a veces sin tildes, en mayúsculas o con espacios de más
+    r = rnd.random()
+    if r < 0.1:
+        return nombre.upper()
+    if r < 0.2:
+        return nombre + " "
+    if r < 0.3:
+        return nombre.replace("á", "a").replace("é", "e").replace("í", "i").replace("ó", "o").replace("ú", "u")
+    return nombre
+
+
+def planilla_partido(nombres, rnd, gen):
+    convocados = rnd.sample(nombres, min(23, len(nombres)))
+    filas = []
+    for camiseta in range(1, 26):
+        if camiseta > len(convocados):
+            filas.append([camiseta, 0, 0, 0, 0, 0, "0/0", None])
+            continue
+        pos, neu, neg = (int(x) for x in gen.poisson([0.4, 2.5, 1.2]))
+        err = int(gen.poisson(0.7))
+        tackles = pos + neu + neg
+        filas.append([camiseta, pos, neu, neg, tackles, err, f"{tackles}/{tackles + err}",
+                      variante(convocados[camiseta - 1], rnd)])
+    resumen = pd.DataFrame(filas, columns=["Jugador", "Positivos", "Neutrales", "Negativos", "Tackles", "Errados",
+                                           "Total tackles", "Nombre del Jugador"])
+    tot = resumen[["Positivos", "Neutrales", "Negativos", "Tackles", "Errados"]].sum()
+    pie = pd.DataFrame([
+        ["Positivos", tot["Positivos"], None, None, tot["Tackles"], tot["Errados"], str(tot["Tackles"] - tot["Errados"]), None],
+        ["Neutrales", tot["Neutrales"], None, None, None, None, None, None],
+        ["Negativos", tot["Negativos"], None, None, None, None, None, None],
+        ["Errados", tot["Errados"], None, None, None, None, None, None],
+    ], columns=resumen.columns)
+    resumen = pd.concat([resumen, pie], ignore_index=True)
+
+    # Registro de cada tackle (la hoja más grande de las planillas reales)
+    eventos = []
+    for _, f in resumen.iloc[:25].iterrows():
+        for tipo, col in zip(TIPOS_TACKLE, ["Positivos", "Neutrales", "Negativos", "Errados"]):
+            eventos += [[rnd.choice(["Primer Tiempo", "Segundo Tiempo"]), f["Jugador"], tipo]] * int(f[col])
+    rnd.shuffle(eventos)
+    registro = pd.DataFrame(eventos, columns=["Tiempo", "Jugador", "Tipo de Tackle"])
+    suplentes = convocados[15:20]
+    cambios = pd.DataFrame({"SALE": rnd.sample(convocados[:15], len(suplentes)), "ENTRA": suplentes})
+    return {"Registro": registro, "Resumen": resumen, "Cambios": cambios}
+
+
+def _lanzamientos(columnas, partidos, gen, ganados=(0.7, 0.3)):
+    """Una fila con propios/rival, ganados, perdidos y totales. `columnas` son los 9 nombres de la hoja."""
+    n_p, n_r = (int(x) for x in gen.integers(5, 20, 2) * partidos)
+    gp, gr = int(gen.binomial(n_p, ganados[0])), int(gen.binomial(n_r, ganados[1]))
+    valores = [n_p, n_r, gp, gr, n_p - gp, n_r - gr, gp + gr, (n_p - gp) + (n_r - gr), n_p + n_r]
+    return pd.DataFrame([dict(zip(columnas, valores))])
+
+
+def estadistica(partidos, rivales, rnd, gen):
+    lanz = ["Lanzamientos propios", "Lanzamientos rival", "Lanzamientos propios ganados", "Lanzamientos rival ganados",
+            "Lanzamientos propios perdidos", "Lanzamientos rival perdidos", "Totales ganados", "Totales perdidos", "Total"]
+    hojas_lanz = {"Line": _lanzamientos(lanz, partidos, gen), "Scrum": _lanzamientos(lanz, partidos, gen, (0.8, 0.2))}
+    for hoja, p in [("Salidas", "Salidas"), ("Salidas de 22", "Salidas 22")]:
+        cols = [f"{p} propias", f"{p} rival", f"{p} propias ganadas", f"{p} rival ganadas", f"{p} propias perdidas",
+                f"{p} rival perdidas", f"{p} total ganadas", f"{p} total perdidas", f"{p} total"]
+        hojas_lanz[hoja] = _lanzamientos(cols, max(1, partidos // 2), gen, (0.3, 0.7))
+
+    filas_pen = [["Line", None, *gen.poisson(0.7 * partidos, 2)]]
+    for situacion in ["Scrum", "Ruck", "Juego"]:
+        filas = [[situacion, m, *gen.poisson(0.4 * partidos, 2)] for m in MOTIVOS[situacion]]
+        filas_pen += filas + [[f"Total {situacion}", None, sum(f[2] for f in filas), sum(f[3] for f in filas)]]
+    filas_pen += [["Maul", None, *gen.poisson(0.4 * partidos, 2)], ["Salida", None, *gen.poisson(0.2 * partidos, 2)],
+                  ["Salida 22", None, 0, 0]]
+    sin_totales = [f for f in filas_pen if not str(f[0]).startswith("Total")]
+    filas_pen.append(["Penales Totales", None, sum(f[2] for f in sin_totales), sum(f[3] for f in sin_totales)])
+    penales = pd.DataFrame(filas_pen, columns=["Situacion", "Motivo", "Propios", "Rival"])
+    penales["Total"] = penales["Propios"] + penales["Rival"]
+
+    chances = gen.integers(4, 20, partidos)
+    concretadas = gen.binomial(chances, 0.4)
+    efectividad = pd.DataFrame({"Rival": [f"{r} ({rnd.choice('LV')})" for r in rivales],
+                                "Concretadas": concretadas.astype(float), "Chances": chances.astype(float)})
+    efectividad.loc[len(efectividad)] = ["Total", concretadas.sum(), chances.sum()]
+    efectividad["%PP"] = efectividad["Concretadas"] / efectividad["Chances"] * 100
+
+    tries_f, tries_c = int(gen.poisson(3.5 * partidos)), int(gen.poisson(2.5 * partidos))
+    conv_ft, conv_ct = tries_f, tries_c
+    conv_fm, conv_cm = int(gen.binomial(conv_ft, 0.65)), int(gen.binomial(conv_ct, 0.7))
+    pen_ft, pen_ct = int(gen.poisson(2.3 * partidos)), int(gen.poisson(2.1 * partidos))
+    pen_fm, pen_cm = int(gen.binomial(pen_ft, 0.7)), int(gen.binomial(pen_ct, 0.7))
+    puntos = pd.DataFrame([{
+        "puntos_favor": 5 * tries_f + 2 * conv_fm + 3 * pen_fm, "puntos_contra": 5 * tries_c + 2 * conv_cm + 3 * pen_cm,
+        "tries_favor": tries_f, "conv_favor_m": conv_fm, "conv_favor_t": conv_ft, "pen_favor_m": pen_fm,
+        "pen_favor_t": pen_ft, "drops_favor": 0, "tries_contra": tries_c, "conv_contra_m": conv_cm,
+        "conv_contra_t": conv_ct, "pen_contra_m": pen_cm, "pen_contra_t": pen_ct, "drops_contra": 0,
+        "partidos": partidos,
+    }])
+    return {
+        "Info": pd.DataFrame({"Variable": ["cantidad_partidos"], "Valor": [partidos]}),
+        "Penales": penales, **hojas_lanz,
+        "Efectividad 22": efectividad, "Puntos": puntos,
+    }
+
+
+def _escribir(ruta, hojas):
+    with pd.ExcelWriter(ruta, engine="openpyxl") as writer:
+        for nombre, df in hojas.items():
+            df.to_excel(writer, sheet_name=nombre, index=False)
+
+
+def generar_temporada(carpeta, partidos=16, jugadores=40, semilla=0):
+    """Escribe `partidos` planillas de partido + Estadistica.xlsx en `carpeta`. Devuelve las rutas."""
+    rnd = random.Random(semilla)
+    gen = np.random.default_rng(semilla)
+    os.makedirs(carpeta, exist_ok=True)
+    nombres = plantel(jugadores, rnd)
+    rivales = [rnd.choice(RIVALES) for _ in range(partidos)]
+    rutas = []
+    for fecha, rival in enumerate(rivales, start=1):
+        ruta = os.path.join(carpeta, f"Tackles_Fecha{fecha}_{rival}.xlsx")
+        _escribir(ruta, planilla_partido(nombres, rnd, gen))
+        rutas.append(ruta)
+    ruta = os.path.join(carpeta, "Estadistica.xlsx")
+    _escribir(ruta, estadistica(partidos, rivales, rnd, gen))
+    return rutas + [ruta]
+
+
+def generar(salida, partidos=16, jugadores=40, temporadas=1, semilla=0):
+    """Una carpeta de datos por temporada. Devuelve la lista de carpetas."""
+    if temporadas == 1:
+        generar_temporada(salida, partidos, jugadores, semilla)
+        return [salida]
+    carpetas = []
+    for t in range(1, temporadas + 1):
+        carpeta = os.path.join(salida, f"temporada_{t}")
+        generar_temporada(carpeta, partidos, jugadores, semilla + t)
+        carpetas.append(carpeta)
+    return carpetas
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Genera planillas sintéticas con la estructura de data/.")
+    parser.add_argument("salida")
+    parser.add_argument("--partidos", type=int, default=16)
+    parser.add_argument("--jugadores", type=int, default=40)
+    parser.add_argument("--temporadas", type=int, default=1)
+    parser.add_argument("--semilla", type=int, default=0)
+    args = parser.parse_args()
+    for carpeta in generar(args.salida, args.partidos, args.jugadores, args.temporadas, args.semilla):
+        print(carpeta)
@@ -0,0 +1,284 @@
+import hashlib
+import json
+import os
+import threading
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from xml.etree import ElementTree
+
+import openpyxl
+import pandas as pd
+
+import medicion
+
+try:
+    # No es API pública de pandas: si deja de estar, se lee con pd.read_excel
+    from pandas.io.parsers import TextParser
+except ImportError:
+    TextParser = None
+
+try:
+    import pyarrow  # noqa: F401  (motor de parquet)
+    HAY_PARQUET = True
+except ImportError:
+    HAY_PARQUET = False
+
+try:
+    from python_calamine import CalamineWorkbook
+    HAY_CALAMINE = True
+except ImportError:
+    HAY_CALAMINE = False
+
+
+# Cache en disco de las hojas 'Resumen' ya parseadas (parquet).
+# Cada planilla tiene un .json con ruta + mtime + tamaño + hash del contenido
+# y un .parquet con la hoja normalizada. Si el mtime cambia pero el hash no,
+# se reutiliza el parquet igual.
+CARPETA_CACHE = os.environ.get("DASHBOARD_CACHE", ".cache")
+
+# Versión del lector/normalización de 'Resumen' (leer_hoja, normalizar_columnas,
+# _para_parquet). Si cambia cómo se parsea la hoja hay que subirla: los parquet
+# de otra versión se descartan.
+VERSION_CACHE = 2
+
+# Procesos para leer planillas en paralelo (0 = automático, 1 = secuencial).
+# En automático solo se abre el pool cuando hay suficientes archivos.
+PROCESOS = int(os.environ.get("DASHBOARD_PROCESOS", "0"))
+UMBRAL_PARALELO = 24
+
+
+def hash_archivo(ruta, bloque=1 << 16):
+    h = hashlib.sha256()
+    with open(ruta, "rb") as f:
+        for chunk in iter(lambda: f.read(bloque), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def huella(ruta):
+    st_arch = os.stat(ruta)
+    return (st_arch.st_mtime_ns, st_arch.st_size)
+
+
+def normalizar_columnas(df):
+    df.columns = df.columns.str.strip().str.lower()
+    for col in df.columns:
+        if "nombre" in col and "jugador" in col:
+            df.rename(columns={col: "nombre del jugador"}, inplace=True)
+    return df
+
+
+def archivos_partidos(carpeta):
+    """Planillas de partido de la carpeta (todos los .xlsx menos Estadistica), ordenadas."""
+    return [
+        os.path.join(carpeta, archivo)
+        for archivo in sorted(os.listdir(carpeta))
+        if archivo.endswith(".xlsx") and not archivo.lower().startswith("estadistica")
+    ]
+
+
+def _para_parquet(df):
+    # Parquet no acepta columnas object mezcladas (ej. 'jugador' = 1..25 + "Positivos")
+    for col in df.columns:
+        if df[col].dtype == object:
+            df[col] = df[col].where(df[col].isna(), df[col].astype(str))
+    return df
+
+
+def _rutas_cache(ruta):
+    clave = hashlib.sha1(os.path.abspath(ruta).encode("utf-8")).hexdigest()
+    base = os.path.join(CARPETA_CACHE, clave)
+    return base + ".json", base + ".parquet"
+
+
+def _leer_meta(ruta_meta):
+    try:
+        with open(ruta_meta, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+# Lectura de una sola hoja: los nombres salen de xl/workbook.xml (sin parsear
+# ninguna hoja) y la hoja se recorre en modo streaming (calamine si está
+# instalado, si no openpyxl read_only). Da lo mismo que read_excel para esa hoja.
+_NS_LIBRO = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+
+
+def hojas_libro(ruta):
+    """Nombres de las hojas de un .xlsx, leyendo solo el índice del libro."""
+    with zipfile.ZipFile(ruta) as z:
+        raiz = ElementTree.fromstring(z.read("xl/workbook.xml"))
+    return [h.get("name") for h in raiz.iter(f"{_NS_LIBRO}sheet")]
+
+
+def _filas_hoja(ruta, hoja):
+    if HAY_CALAMINE:
+        return CalamineWorkbook.from_path(ruta).get_sheet_by_name(hoja).to_python(skip_empty_area=False)
+    libro = openpyxl.load_workbook(ruta, read_only=True, data_only=True, keep_links=False)
+    try:
+        return list(libro[hoja].iter_rows(values_only=True))
+    finally:
+        libro.close()
+
+
+def _celda(v):
+    # Como el lector openpyxl de read_excel: vacío -> "", 3.0 -> 3
+    if v is None:
+        return ""
+    if isinstance(v, float) and v.is_integer():
+        return int(v)
+    return v
+
+
+def leer_hoja(ruta, hoja):
+    """Una hoja como DataFrame (primera fila = encabezados), sin leer las demás. None si no existe.
+
+    Las filas pasan por el mismo TextParser que usa read_excel, así que tipos,
+    encabezados repetidos y celdas vacías quedan igual que con pd.read_excel.
+    """
+    if hoja not in hojas_libro(ruta):
+        return None
+    return _leer_hoja(ruta, hoja)
+
+
+def _leer_hoja(ruta, hoja):
+    # La hoja ya se sabe que existe
+    if TextParser is None:
+        return pd.read_excel(ruta, sheet_name=hoja)
+    filas = [[_celda(v) for v in fila] for fila in _filas_hoja(ruta, hoja)]
+    while filas and all(v == "" for v in filas[-1]):
+        filas.pop()
+    if not filas:
+        return pd.DataFrame()
+    ancho = max(len(f) for f in filas)
+    while ancho and all(len(f) < ancho or f[ancho - 1] == "" for f in filas):
+        ancho -= 1
+    filas = [f[:ancho] + [""] * (ancho - len(f)) for f in filas]
+    return TextParser(filas, header=0).read()
+
+
+def leer_hojas(ruta, hojas):
+    """{hoja: df} de las `hojas` que tiene la planilla (columnas en minúscula), sin leer las demás."""
+    presentes = set(hojas_libro(ruta))
+    leidas = {}
+    for hoja in hojas:
+        if hoja in presentes:
+            df = _leer_hoja(ruta, hoja)
+            df.columns = df.columns.astype(str).str.strip().str.lower()
+            leidas[hoja] = df
+    return leidas
+
+
+def _parsear_resumen(ruta):
+    resumen = leer_hoja(ruta, "Resumen")
+    if resumen is None:
+        return None
+    return _para_parquet(normalizar_columnas(resumen))
+
+
+def leer_resumen(ruta, usar_cache=True):
+    """Hoja 'Resumen' normalizada de una planilla de partido, o None si no la tiene."""
+    return _leer_resumen(ruta, usar_cache)[0]
+
+
+def _leer_resumen(ruta, usar_cache=True):
+    # (resumen, estado de la cache): "acierto", "acierto_hash" (mtime cambió, contenido no), "fallo" o "sin_cache"
+    if not (usar_cache and HAY_PARQUET):
+        return _parsear_resumen(ruta), "sin_cache"
+
+    ruta_meta, ruta_parquet = _rutas_cache(ruta)
+    st_arch = os.stat(ruta)
+    meta = _leer_meta(ruta_meta)
+    if meta and meta.get("version") == VERSION_CACHE and os.path.exists(ruta_parquet):
+        if meta["mtime_ns"] == st_arch.st_mtime_ns and meta["tamanio"] == st_arch.st_size:
+            return pd.read_parquet(ruta_parquet), "acierto"
+        hash_actual = hash_archivo(ruta)
+        if meta["hash"] == hash_actual:
+            # Tocado pero sin cambios: solo se actualiza el mtime
+            meta.update(mtime_ns=st_arch.st_mtime_ns, tamanio=st_arch.st_size)
+            _guardar_meta(ruta_meta, meta)
+            return pd.read_parquet(ruta_parquet), "acierto_hash"
+    else:
+        hash_actual = hash_archivo(ruta)
+
+    resumen = _parsear_resumen(ruta)
+    if resumen is None:
+        return None, "fallo"
+    try:
+        os.makedirs(CARPETA_CACHE, exist_ok=True)
+        tmp = ruta_parquet + f".{os.getpid()}.tmp"
+        resumen.to_parquet(tmp, index=False)
+        os.replace(tmp, ruta_parquet)
+        _guardar_meta(ruta_meta, {
+            "version": VERSION_CACHE, "ruta": os.path.abspath(ruta), "mtime_ns": st_arch.st_mtime_ns,
+            "tamanio": st_arch.st_size, "hash": hash_actual,
+        })
+    except (OSError, ValueError, TypeError):
+        # Sin permisos de escritura o tipos que parquet no acepta: se sigue sin cache
+        pass
+    return resumen, "fallo"
+
+
+def _guardar_meta(ruta_meta, meta):
+    tmp = ruta_meta + f".{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+    os.replace(tmp, ruta_meta)
+
+
+
+def _leer_seguro(ruta):
+    # (ruta, resumen, error, segundos, estado de la cache); se mide acá porque puede correr en otro proceso
+    t0 = time.perf_counter()
+    try:
+        resumen, estado = _leer_resumen(ruta)
+        return ruta, resumen, None, time.perf_counter() - t0, estado
+    except Exception as e:
+        return ruta, None, str(e), time.perf_counter() - t0, "error"
+
+
+def leer_resumenes(archivos, procesos=None):
+    """Lee las hojas 'Resumen' de varias planillas, en paralelo si conviene.
+
+    Devuelve (archivo, resumen, error) en el mismo orden que `archivos`.
+    resumen=None y error=None significa que la planilla no tiene hoja 'Resumen'.
+    """
+    archivos = list(archivos)
+    if procesos is None:
+        procesos = PROCESOS
+    if procesos == 0:
+        procesos = (os.cpu_count() or 1) if len(archivos) >= UMBRAL_PARALELO else 1
+    procesos = min(procesos, len(archivos))
+    if procesos <= 1:
+        leidos = [_leer_seguro(a) for a in archivos]
+    else:
+        with ProcessPoolExecutor(max_workers=procesos) as pool:
+            leidos = list(pool.map(_leer_seguro, archivos, chunksize=max(1, len(archivos) // (procesos * 4))))
+    for ruta, _, _, segundos, estado in leidos:
+        medicion.agregar(f"carga:{os.path.basename(ruta)}", segundos, cache=estado, procesos=procesos)
+        if estado in ("acierto", "acierto_hash", "fallo"):
+            medicion.contar("parquet", estado != "fallo")
+    return [(ruta, resumen, error) for ruta, resumen, error, _, _ in leidos]
+
+# Estadistica.xlsx: se parsea una sola vez y se memoiza por huella (mtime + tamaño)
+_memo_estadistica = {}
+_lock_estadistica = threading.Lock()
+
+
+def leer_estadistica(ruta):
+    """Todas las hojas de Estadistica.xlsx con columnas en minúscula. Devuelve copias."""
+    clave = os.path.abspath(ruta)
+    h = huella(ruta)
+    with _lock_estadistica:
+        memo = _memo_estadistica.get(clave)
+        medicion.contar("estadistica", memo is not None and memo[0] == h)
+        if memo is None or memo[0] != h:
+            with medicion.etapa("estadistica:read_excel"):
+                hojas = pd.read_excel(ruta, sheet_name=None)
+            for df in hojas.values():
+                df.columns = df.columns.astype(str).str.strip().str.lower()
+            memo = (h, hojas)
+            _memo_estadistica[clave] = memo
+    return {nombre: df.copy() for nombre, df in memo[1].items()}
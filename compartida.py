@@ -0,0 +1,158 @@
+import os
+import sys
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+import plotly.io as pio
+
+import medicion
+
+
+# Cache del proceso compartida por todas las sesiones del tablero: consultas del
+# almacén, cubos y figuras. Los valores son de solo lectura (quien los modifica
+# tiene que copiarlos). Cada entrada pertenece a un grupo (temporada, plantel):
+# cuando el total pasa el tope se desalojan grupos enteros, el menos usado
+# primero. Si cambia la versión de un grupo (se importaron datos nuevos) se
+# descarta lo que tenía. La carga es single-flight: si varias sesiones piden la
+# misma clave a la vez, una sola la calcula y las demás esperan ese resultado.
+# DASHBOARD_CACHE_MB: tope en MB (por defecto 512).
+MAX_MB = float(os.environ.get("DASHBOARD_CACHE_MB", "512"))
+
+
+def tamanio(valor):
+    """Bytes aproximados de un valor cacheado."""
+    if isinstance(valor, pd.DataFrame):
+        return int(valor.memory_usage(deep=True).sum())
+    if isinstance(valor, (pd.Series, pd.Index)):
+        return int(valor.memory_usage(deep=True))
+    if isinstance(valor, np.ndarray):
+        return int(valor.nbytes)
+    if isinstance(valor, go.Figure):
+        return len(pio.to_json(valor, validate=False))
+    if isinstance(valor, dict):
+        return sys.getsizeof(valor) + sum(tamanio(k) + tamanio(v) for k, v in valor.items())
+    if isinstance(valor, (list, tuple)):
+        return sys.getsizeof(valor) + sum(tamanio(v) for v in valor)
+    if hasattr(valor, "__dict__") and not isinstance(valor, type):
+        return sys.getsizeof(valor) + tamanio(vars(valor))
+    return sys.getsizeof(valor)
+
+
+class _Grupo:
+    def __init__(self, version):
+        self.version = version
+        self.entradas = OrderedDict()   # clave -> (valor, bytes)
+        self.bytes = 0
+
+
+class CacheCompartida:
+    def __init__(self, max_mb=MAX_MB):
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self._lock = threading.Lock()
+        self._grupos = OrderedDict()    # grupo -> _Grupo
+        self._en_curso = {}             # (grupo, version, clave) -> Future
+        self.bytes = 0
+        self.desalojos = 0
+
+    def obtener(self, grupo, clave, cargar, version=None, nombre="compartida"):
+        """Valor de la clave en el grupo; si no está, lo calcula `cargar()` (una sola vez)."""
+        with self._lock:
+            g = self._grupo(grupo, version)
+            entrada = g.entradas.get(clave)
+            if entrada is not None:
+                g.entradas.move_to_end(clave)
+                self._grupos.move_to_end(grupo)
+                medicion.contar(nombre, True)
+                return entrada[0]
+            vuelo = (grupo, version, clave)
+            futuro = self._en_curso.get(vuelo)
+            propio = futuro is None
+            if propio:
+                futuro = self._en_curso[vuelo] = Future()
+        if not propio:
+            # Otra sesión lo está calculando: se espera su resultado
+            medicion.contar(nombre, True)
+            with medicion.etapa(f"espera:{nombre}"):
+                return futuro.result()
+
+        medicion.contar(nombre, False)
+        try:
+            valor = cargar()
+        except BaseException as e:
+            with self._lock:
+                self._en_curso.pop(vuelo, None)
+            futuro.set_exception(e)
+            raise
+        n_bytes = tamanio(valor)
+        with self._lock:
+            self._en_curso.pop(vuelo, None)
+            g = self._grupos.get(grupo)
+            if g is not None and g.version != version:
+                # Mientras se calculaba, otra sesión pasó el grupo a otra versión:
+                # el valor se devuelve pero no se guarda (ni se pisa la versión nueva)
+                futuro.set_result(valor)
+                return valor
+            g = self._grupo(grupo, version)
+            if clave not in g.entradas:
+                g.entradas[clave] = (valor, n_bytes)
+                g.bytes += n_bytes
+                self.bytes += n_bytes
+            self._podar(grupo)
+        futuro.set_result(valor)
+        return valor
+
+    def _grupo(self, grupo, version):
+        g = self._grupos.get(grupo)
+        if g is not None and g.version != version:
+            self._quitar(grupo)
+            g = None
+        if g is None:
+            g = self._grupos[grupo] = _Grupo(version)
+        return g
+
+    def _quitar(self, grupo):
+        g = self._grupos.pop(grupo)
+        self.bytes -= g.bytes
+
+    def _podar(self, actual):
+        # Primero grupos enteros (menos usados); si el actual solo ya pasa el tope,
+        # sus entradas más viejas
+        for grupo in list(self._grupos):
+            if self.bytes <= self.max_bytes:
+                return
+            if grupo != actual:
+                self._quitar(grupo)
+                self.desalojos += 1
+        g = self._grupos.get(actual)
+        while g is not None and self.bytes > self.max_bytes and len(g.entradas) > 1:
+            _, (_, n_bytes) = g.entradas.popitem(last=False)
+            g.bytes -= n_bytes
+            self.bytes -= n_bytes
+            self.desalojos += 1
+
+    def limpiar(self, grupo=None):
+        with self._lock:
+            if grupo is None:
+                self._grupos.clear()
+                self.bytes = 0
+            elif grupo in self._grupos:
+                self._quitar(grupo)
+
+    def estado(self):
+        """{grupo: (entradas, MB)} y totales, para el panel de rendimiento."""
+        with self._lock:
+            return dict(
+                mb=self.bytes / 1024 / 1024, max_mb=self.max_bytes / 1024 / 1024, desalojos=self.desalojos,
+                grupos={grupo: (len(g.entradas), g.bytes / 1024 / 1024) for grupo, g in self._grupos.items()},
+            )
+
+
+cache = CacheCompartida()
+
+
+def obtener(grupo, clave, cargar, version=None, nombre="compartida"):
+    return cache.obtener(grupo, clave, cargar, version, nombre)
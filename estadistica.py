@@ -0,0 +1,256 @@
+import numpy as np
+import pandas as pd
+
+
+# Totales de la temporada derivados de filas por partido, sin filas sumadas a mano.
+# Cada planilla de partido puede traer hojas 'Line', 'Scrum', 'Salidas', 'Salidas de 22',
+# 'Penales' y 'Efectividad 22' con los números de ese partido (mismas columnas que en
+# Estadistica.xlsx; en 'Efectividad 22' también 'creadas' en lugar de 'chances'). Cada fila se lleva a contadores (hoja, clave, columna) y los totales
+# se arman sumando contadores: las columnas derivadas (propios, totales, total, %pp) y las
+# filas 'Total ...' / 'Penales Totales' se calculan, no se leen.
+# Las hojas que no traen todos los partidos se derivan de las filas de detalle de Estadistica.xlsx
+# (sin su fila de totales; Line/Scrum/Salidas solo tienen esa fila y se usan como aporte único).
+
+# hoja -> (propios, rival, prefijo de totales, total, sufijo ganados, sufijo perdidos)
+LANZAMIENTOS = {
+    "Line": ("lanzamientos propios", "lanzamientos rival", "totales", "total", "ganados", "perdidos"),
+    "Scrum": ("lanzamientos propios", "lanzamientos rival", "totales", "total", "ganados", "perdidos"),
+    "Salidas": ("salidas propias", "salidas rival", "salidas total", "salidas total", "ganadas", "perdidas"),
+    "Salidas de 22": ("salidas 22 propias", "salidas 22 rival", "salidas 22 total", "salidas 22 total",
+                      "ganadas", "perdidas"),
+}
+HOJAS = list(LANZAMIENTOS) + ["Penales", "Efectividad 22"]
+
+
+def _contadores(df, columnas, hoja):
+    faltan = [c for c in columnas if c not in df.columns]
+    if faltan:
+        raise ValueError(f"faltan columnas en '{hoja}': {', '.join(faltan)}")
+    crudos = df[columnas]
+    valores = crudos.apply(pd.to_numeric, errors="coerce")
+    invalidos = (valores.isna() & crudos.notna()) | (valores < 0) | (valores.notna() & (valores % 1 != 0))
+    if invalidos.any().any():
+        col = invalidos.any().idxmax()
+        raise ValueError(f"valores inválidos en la columna '{col}' de '{hoja}'")
+    return valores.fillna(0).astype("int64")
+
+
+def _texto(v):
+    return "" if pd.isna(v) else " ".join(str(v).split())
+
+
+def filas_hoja(hoja, df, rival=None):
+    """Filas de una hoja -> [(hoja, clave, columna, valor)]. Lanza ValueError si faltan columnas o hay valores inválidos.
+
+    Se ignoran las filas de totales ('Total ...', 'Penales Totales', 'Total') y las vacías.
+    `rival` es la etiqueta de la fila de 'Efectividad 22' si la hoja no trae columna rival.
+    """
+    if hoja in LANZAMIENTOS:
+        propios, rival_, _, _, g, p = LANZAMIENTOS[hoja]
+        columnas = [f"{propios} {g}", f"{propios} {p}", f"{rival_} {g}", f"{rival_} {p}"]
+        valores = _contadores(df, columnas, hoja).sum()
+        return [(hoja, "", col, int(valores[col])) for col in columnas]
+
+    if hoja == "Penales":
+        situacion = df["situacion"].map(_texto).astype(str) if "situacion" in df.columns else None
+        if situacion is None or "motivo" not in df.columns:
+            raise ValueError("faltan columnas en 'Penales': situacion, motivo")
+        detalle = (situacion != "") & ~situacion.str.lower().str.startswith("total") \
+            & (situacion.str.lower() != "penales totales")
+        valores = _contadores(df[detalle], ["propios", "rival"], hoja)
+        claves = [f"{s}|{_texto(m)}" for s, m in zip(situacion[detalle], df.loc[detalle, "motivo"])]
+        return [(hoja, clave, col, int(v)) for clave, fila in zip(claves, valores.itertuples(index=False))
+                for col, v in zip(["propios", "rival"], fila)]
+
+    if hoja == "Efectividad 22":
+        columnas = ["concretadas", "chances"]
+        if "chances" not in df.columns and "creadas" in df.columns:
+            df = df.rename(columns={"creadas": "chances"})
+        valores = _contadores(df, columnas, hoja)
+        if "rival" in df.columns:
+            etiquetas = df["rival"].map(_texto).astype(str)
+            detalle = (etiquetas != "") & (etiquetas.str.lower() != "total")
+        else:
+            etiquetas = pd.Series(rival or "", index=df.index)
+            detalle = df[columnas].notna().any(axis=1)
+        return [(hoja, etiquetas[i], col, int(v)) for i, fila in zip(valores.index[detalle], valores[detalle].itertuples(index=False))
+                for col, v in zip(columnas, fila)]
+    return []
+
+
+def filas_partido(hojas, rival=None):
+    """Filas de todas las hojas de estadística de una planilla de partido ({hoja: df}, columnas en minúscula)."""
+    return [fila for hoja in HOJAS if hoja in hojas for fila in filas_hoja(hoja, hojas[hoja], rival)]
+
+
+def _armar(hoja, valores):
+    """Hoja con el formato de Estadistica.xlsx a partir de {(clave, columna): valor}."""
+    if hoja in LANZAMIENTOS:
+        propios, rival, totales, total, g, p = LANZAMIENTOS[hoja]
+        v = {col: valores.get(("", col), 0) for col in [f"{propios} {g}", f"{propios} {p}", f"{rival} {g}", f"{rival} {p}"]}
+        fila = {
+            propios: v[f"{propios} {g}"] + v[f"{propios} {p}"], rival: v[f"{rival} {g}"] + v[f"{rival} {p}"],
+            **v,
+            f"{totales} {g}": v[f"{propios} {g}"] + v[f"{rival} {g}"],
+            f"{totales} {p}": v[f"{propios} {p}"] + v[f"{rival} {p}"],
+        }
+        fila[total] = fila[propios] + fila[rival]
+        return pd.DataFrame([fila])
+
+    claves = list(dict.fromkeys(clave for clave, _ in valores))
+    if hoja == "Penales":
+        filas, total = [], {"propios": 0, "rival": 0}
+        situaciones = list(dict.fromkeys(c.split("|")[0] for c in claves))
+        for situacion in situaciones:
+            propias = [c for c in claves if c.split("|")[0] == situacion]
+            sub = {"propios": 0, "rival": 0}
+            for clave in propias:
+                motivo = clave.split("|", 1)[1]
+                fila = {col: valores.get((clave, col), 0) for col in sub}
+                filas.append({"situacion": situacion, "motivo": motivo or np.nan, **fila})
+                for col in sub:
+                    sub[col] += fila[col]
+                    total[col] += fila[col]
+            if any(c.split("|", 1)[1] for c in propias):
+                filas.append({"situacion": f"Total {situacion}", "motivo": np.nan, **sub})
+        filas.append({"situacion": "Penales Totales", "motivo": np.nan, **total})
+        df = pd.DataFrame(filas, columns=["situacion", "motivo", "propios", "rival"])
+        df["total"] = df["propios"] + df["rival"]
+        return df
+
+    if hoja == "Efectividad 22":
+        df = pd.DataFrame({"rival": claves,
+                           "concretadas": [valores.get((c, "concretadas"), 0) for c in claves],
+                           "chances": [valores.get((c, "chances"), 0) for c in claves]})
+        df.loc[len(df)] = ["Total", df["concretadas"].sum(), df["chances"].sum()]
+        df["%pp"] = df["concretadas"] / df["chances"].where(df["chances"] > 0) * 100
+        return df
+    return None
+
+
+# Columnas de 'Efectividad 22' que se calculan; el resto se copia de Estadistica.xlsx por rival
+CALCULADAS_22 = {"rival", "concretadas", "chances", "creadas", "%pp"}
+
+
+def _columnas_base_22(df, base):
+    extra = [c for c in base.columns if c not in CALCULADAS_22]
+    if not extra or "rival" not in base.columns:
+        return df
+    por_rival = base[extra].set_index(base["rival"].map(_texto).astype(str))
+    por_rival = por_rival[(por_rival.index != "") & ~por_rival.index.duplicated()]
+    df = df.join(por_rival, on="rival")
+    return df[[c for c in base.columns if c in df.columns] + [c for c in df.columns if c not in base.columns]]
+
+
+class AgregadoEstadistica:
+    """Contadores por partido y totales de la temporada, sumando/restando el aporte de cada partido.
+
+    Los totales de un subconjunto de partidos salen de una sola pasada sobre la
+    matriz partidos × contadores.
+    """
+
+    def __init__(self):
+        self.contadores = {}   # (hoja, clave, columna) -> columna de la matriz
+        self.partidos = {}     # partido -> {columna: valor}
+        self.hojas_partido = {}  # partido -> hojas que trae
+        self.totales = np.zeros(0, dtype=np.int64)
+        self._matriz = None
+
+    def _columna(self, contador):
+        if contador not in self.contadores:
+            self.contadores[contador] = len(self.contadores)
+            self.totales = np.append(self.totales, 0)
+        return self.contadores[contador]
+
+    def agregar(self, partido, filas):
+        self.quitar(partido)
+        aporte = {}
+        for hoja, clave, columna, valor in filas:
+            j = self._columna((hoja, clave, columna))
+            aporte[j] = aporte.get(j, 0) + int(valor)
+        for j, valor in aporte.items():
+            self.totales[j] += valor
+        self.partidos[partido] = aporte
+        self.hojas_partido[partido] = {hoja for hoja, _, _, _ in filas}
+        self._matriz = None
+
+    def quitar(self, partido):
+        aporte = self.partidos.pop(partido, None)
+        if aporte is None:
+            return
+        for j, valor in aporte.items():
+            self.totales[j] -= valor
+        self.hojas_partido.pop(partido)
+        self._matriz = None
+
+    def matriz(self):
+        """(partidos, matriz partidos × contadores)."""
+        if self._matriz is None:
+            partidos = list(self.partidos)
+            m = np.zeros((len(partidos), len(self.contadores)), dtype=np.int64)
+            for i, p in enumerate(partidos):
+                if self.partidos[p]:
+                    cols, vals = zip(*self.partidos[p].items())
+                    m[i, list(cols)] = vals
+            self._matriz = (partidos, m)
+        return self._matriz
+
+    def sumar(self, partidos=None):
+        """Vector de totales de los partidos elegidos (None = todos)."""
+        if partidos is None:
+            return self.totales.copy()
+        nombres, m = self.matriz()
+        elegidos = set(partidos)
+        return np.array([p in elegidos for p in nombres], dtype=np.int64) @ m
+
+    def _elegidos(self, partidos):
+        seleccion = None if partidos is None else set(partidos)
+        return [p for p in self.partidos if seleccion is None or p in seleccion]
+
+    def hojas_de_partidos(self, partidos=None):
+        """Hojas que salen de las planillas de los partidos elegidos: las que traen todos (ninguna si no hay elegidos)."""
+        elegidos = self._elegidos(partidos)
+        return {h for h in HOJAS if elegidos and all(h in self.hojas_partido[p] for p in elegidos)}
+
+    def hojas(self, partidos=None, base=None):
+        """Hojas derivadas de los partidos elegidos, sobre las de Estadistica.xlsx (`base`).
+
+        Una hoja se deriva de los partidos si todos los elegidos la traen (ver
+        hojas_de_partidos); si no, de las filas de detalle de `base`, con los totales
+        de la temporada (si su formato no es el esperado, queda como está).
+        En 'Efectividad 22' las columnas que no se calculan se copian de `base` por rival.
+        """
+        hojas = dict(base or {})
+        vector = self.sumar(partidos)
+        elegidos = self._elegidos(partidos)
+        con_partidos = self.hojas_de_partidos(partidos)
+        # Solo las filas (motivos, rivales) que traen los partidos elegidos
+        presentes = set().union(*(self.partidos[p] for p in elegidos)) if elegidos else set()
+        for hoja in HOJAS:
+            if hoja in con_partidos:
+                valores = {(c, col): int(vector[j]) for (h, c, col), j in self.contadores.items()
+                           if h == hoja and j in presentes}
+            elif hoja in hojas:
+                try:
+                    valores = {}
+                    for _, clave, col, v in filas_hoja(hoja, hojas[hoja]):
+                        valores[(clave, col)] = valores.get((clave, col), 0) + v
+                except ValueError:
+                    continue
+            else:
+                continue
+            hojas[hoja] = _armar(hoja, valores)
+            if hoja == "Efectividad 22" and base and hoja in base:
+                hojas[hoja] = _columnas_base_22(hojas[hoja], base[hoja])
+        if "Penales" in con_partidos:
+            n = sum(1 for p in elegidos if "Penales" in self.hojas_partido[p])
+            hojas["Info"] = pd.DataFrame({"variable": ["cantidad_partidos"], "valor": [n]})
+        return hojas
+
+
+def derivar(hojas, partidos=None):
+    """Hojas de Estadistica.xlsx con los totales recalculados. `partidos`: {partido: filas} opcional."""
+    agregado = AgregadoEstadistica()
+    for partido, filas in (partidos or {}).items():
+        agregado.agregar(partido, filas)
+    return agregado.hojas(base=hojas)
@@ -0,0 +1,45 @@
+# Estilos del tablero: los usa dashboard.py y la exportación estática (exportar_tablero.py)
+DASHBOARD_CSS = """
+<style>
+.block-container{padding-top:2.1rem;padding-bottom:.8rem}
+h1{margin-top:0!important}
+
+.kpi{
+  background:#202226;border:1px solid #2e3136;border-radius:14px;
+  padding:14px 16px;text-align:center;
+  display:flex;flex-direction:column;align-items:center;justify-content:center;
+  min-height:88px;
+  color:#fff
+}
+.kpi .val{font-size:34px;font-weight:800;line-height:1;letter-spacing:.2px;color:#fff}
+.kpi .lbl{opacity:.9;font-size:13px;margin-top:6px;color:#e6e9ef}
+
+.card{
+  background:#202226;border:1px solid #2e3136;border-radius:14px;
+  padding:12px 14px;box-shadow:0 2px 10px rgba(0,0,0,.25)}
+.card h4{color:#e9eef2}
+.card p, .card span, .card .stMarkdown, .card .stCaption{color:#cfd6e0}
+
+.header-row{
+  display:flex;
+  gap:8px;
+  align-items:center;
+  justify-content:flex-start;    /* pegados a la izquierda */
+  margin:2px 2px 8px 2px;
+}
+.header-row h3,.header-row h4,.header-row h2{
+  margin:0;
+  font-weight:700;
+  display:inline-block;
+}
+
+.header-row .stSelectbox{margin-top:0 !important;}
+.header-row .stSelectbox > div{
+  min-width:140px !important;
+  display:inline-block !important;
+}
+.stSelectbox label{display:none}
+
+.js-plotly-plot .legend{margin-top:-4px}
+</style>
+"""
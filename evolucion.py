@@ -0,0 +1,242 @@
+import os
+import re
+
+import numpy as np
+import pandas as pd
+
+import compartida
+from tackles import COLUMNAS_TACKLES, completar_sumado
+
+
+METRICAS = COLUMNAS_TACKLES + ["PJ"]
+VENTANA_MOVIL = 3
+EQUIPO = "Equipo"
+LIGA, COPA = "Liga", "Copa"
+
+_RE_FECHA = re.compile(r"fecha\s*_?(\d+)", re.IGNORECASE)
+_RE_DIA = re.compile(r"^(?:(\d{4})-(\d{1,2})-(\d{1,2})|(\d{1,2})-(\d{1,2})-(\d{4}))$")
+
+
+def numero_fecha(archivo):
+    """Número de fecha del nombre del archivo (Tackles_Fecha10_UniR.xlsx -> 10), o None."""
+    m = _RE_FECHA.search(os.path.basename(archivo))
+    return int(m.group(1)) if m else None
+
+
+def datos_partido(archivo):
+    """Fecha, código de torneo, rival, día (opcional) y torneo a partir del nombre del archivo.
+
+    Tackles_Fecha10_UniR.xlsx -> fecha 10, rival 'UniR', Liga.
+    Tackles_FechaCRAI_CSF_2025-09-20.xlsx -> código 'CRAI', rival 'CSF', día '2025-09-20', Copa.
+    """
+    partes = os.path.splitext(os.path.basename(archivo))[0].split("_")
+    if partes and partes[0].lower() == "tackles":
+        partes = partes[1:]
+    dia = None
+    for i, parte in enumerate(partes):
+        m = _RE_DIA.match(parte)
+        if m:
+            a, mes, d = (m.group(1), m.group(2), m.group(3)) if m.group(1) else (m.group(6), m.group(5), m.group(4))
+            dia = f"{int(a):04d}-{int(mes):02d}-{int(d):02d}"
+            del partes[i]
+            break
+    fecha, codigo = numero_fecha(archivo), None
+    if partes and partes[0].lower().startswith("fecha"):
+        resto = partes.pop(0)[5:]
+        if fecha is None and resto:
+            codigo = resto
+    return dict(fecha=fecha, codigo=codigo, rival=" ".join(partes) or None, dia=dia,
+                torneo=LIGA if fecha is not None else COPA)
+
+
+def etiqueta_partido(archivo):
+    """Etiqueta corta para los ejes: 'F10 UniR', o el resto del nombre si no hay número."""
+    base = os.path.splitext(os.path.basename(archivo))[0]
+    partes = base.split("_")[1:] if base.lower().startswith("tackles_") else base.split("_")
+    texto = " ".join(partes)
+    texto = re.sub(r"^fecha\s*(?=\d)", "F", texto, flags=re.IGNORECASE)
+    return re.sub(r"^fecha\s*", "", texto, flags=re.IGNORECASE)
+
+
+def orden_partidos(archivos):
+    # Primero las fechas numeradas en orden; después el resto por nombre
+    return sorted(archivos, key=lambda a: (numero_fecha(a) is None, numero_fecha(a) or 0, os.path.basename(a)))
+
+
+def filtrar_partidos(indice, rivales=None, fechas=None, torneos=None):
+    """Archivos del índice de partidos que pasan los filtros (None o vacío = sin filtrar).
+
+    `fechas` es un rango (desde, hasta) de números de fecha; deja afuera los partidos sin número.
+    """
+    mascara = np.ones(len(indice), dtype=bool)
+    if rivales:
+        mascara &= indice["rival"].isin(rivales).to_numpy()
+    if fechas is not None:
+        mascara &= indice["fecha"].between(*fechas).fillna(False).to_numpy(dtype=bool)
+    if torneos:
+        mascara &= indice["torneo"].isin(torneos).to_numpy()
+    return indice.index[mascara].tolist()
+
+
+def _efectividad(tackles, errados):
+    intentos = tackles + errados
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(intentos > 0, tackles / intentos * 100, np.nan)
+
+
+# Cubo partido × jugador × métrica armado una sola vez a partir de la tabla de
+# hechos, con los acumulados y la suma móvil (por fecha) precalculados.
+class CuboTackles:
+    def __init__(self, hechos, ventana=VENTANA_MOVIL):
+        partidos = orden_partidos(list(hechos["partido"].cat.categories))
+        pos_partido = {p: i for i, p in enumerate(partidos)}
+        mapa = np.array([pos_partido[p] for p in hechos["partido"].cat.categories], dtype=np.intp)
+
+        self.partidos = partidos
+        self.etiquetas = [etiqueta_partido(p) for p in partidos]
+        self.jugadores = list(hechos["nombre del jugador"].cat.categories)
+        self.ids = np.full(len(self.jugadores), -1, dtype=np.int64)
+        self.metricas = METRICAS
+        self.ventana = ventana
+
+        i_partido = mapa[hechos["partido"].cat.codes.to_numpy()]
+        i_jugador = hechos["nombre del jugador"].cat.codes.to_numpy()
+        self.ids[i_jugador] = hechos["id_jugador"].to_numpy()
+        valores = np.zeros((len(partidos), len(self.jugadores), len(METRICAS)), dtype=np.int32)
+        contadores = np.column_stack([hechos[c].to_numpy(dtype=np.int32) for c in COLUMNAS_TACKLES]
+                                     + [np.ones(len(hechos), dtype=np.int32)])
+        np.add.at(valores, (i_partido, i_jugador), contadores)
+
+        self.valores = valores
+        self.acumulado = valores.cumsum(axis=0)
+        previo = np.zeros_like(self.acumulado)
+        if len(partidos) > ventana:
+            previo[ventana:] = self.acumulado[:-ventana]
+        self.movil = self.acumulado - previo
+        self._pos_jugador = {j: i for i, j in enumerate(self.jugadores)}
+
+    def mascara(self, archivos):
+        """Máscara de partidos del cubo (para filtrar con lo que devuelve filtrar_partidos)."""
+        return np.isin(self.partidos, list(archivos))
+
+    def jugadores_con_partidos(self, mascara=None):
+        if mascara is None:
+            pj = self.acumulado[-1, :, METRICAS.index("PJ")] if len(self.partidos) else np.zeros(0)
+        else:
+            pj = self.valores[mascara, :, METRICAS.index("PJ")].sum(axis=0)
+        return sorted(j for j, n in zip(self.jugadores, pj) if n > 0)
+
+    def totales(self, mascara=None):
+        """Totales por jugador de los partidos de la máscara, con las columnas de df_sumado."""
+        valores = self.valores if mascara is None else self.valores[mascara]
+        df = pd.DataFrame(valores.sum(axis=0, dtype=np.int64), columns=METRICAS)
+        df.insert(0, "nombre del jugador", pd.Series(self.jugadores, dtype=str))
+        df.insert(0, "id_jugador", self.ids)
+        return completar_sumado(df[df["PJ"] > 0])
+
+    def _corte(self, arreglo, jugador):
+        if jugador is None or jugador == EQUIPO:
+            return arreglo.sum(axis=1)
+        return arreglo[:, self._pos_jugador[jugador], :]
+
+    def serie(self, jugador=None, mascara=None):
+        """Evolución por fecha de un jugador (o del equipo si es None / EQUIPO).
+
+        Con `mascara`, solo los partidos elegidos (acumulados y móvil sobre esos partidos).
+        """
+        por_partido = self._corte(self.valores, jugador)
+        etiquetas = self.etiquetas
+        if mascara is None:
+            acumulado = self._corte(self.acumulado, jugador)
+            movil = self._corte(self.movil, jugador)
+        else:
+            por_partido = por_partido[mascara]
+            etiquetas = [e for e, elegido in zip(etiquetas, mascara) if elegido]
+            acumulado = por_partido.cumsum(axis=0)
+            movil = acumulado.copy()
+            movil[self.ventana:] -= acumulado[:-self.ventana]
+        t, e = METRICAS.index("tackles"), METRICAS.index("errados")
+        df = pd.DataFrame(por_partido, columns=METRICAS, index=pd.Index(etiquetas, name="partido"))
+        df["efectividad"] = _efectividad(por_partido[:, t], por_partido[:, e])
+        df["tackles acumulados"] = acumulado[:, t]
+        df["errados acumulados"] = acumulado[:, e]
+        df["efectividad acumulada"] = _efectividad(acumulado[:, t], acumulado[:, e])
+        df["efectividad móvil"] = _efectividad(movil[:, t], movil[:, e])
+        return df
+
+
+# Matriz densa jugador × métrica para comparar jugadores: totales, tasas por PJ,
+# efectividad y el percentil de cada valor dentro del plantel. Se arma una vez
+# por versión de los datos (y por selección de partidos); comparar cualquier
+# conjunto de jugadores es indexar filas.
+TASAS = ["tackles", "errados", "positivos", "neutrales", "negativos"]
+COMPARADAS = METRICAS + ["intentos", "efectividad"] + [f"{m}/PJ" for m in TASAS]
+MENOS_ES_MEJOR = {"errados", "negativos", "errados/PJ", "negativos/PJ"}
+
+
+def percentiles(matriz, menos_es_mejor=()):
+    """Percentil de cada valor en su columna (0-100, empates al medio). NaN queda NaN.
+
+    `menos_es_mejor`: índices de columnas donde el valor más bajo es el mejor percentil.
+    """
+    resultado = np.full(matriz.shape, np.nan)
+    for j in range(matriz.shape[1]):
+        columna = matriz[:, j]
+        validos = ~np.isnan(columna)
+        ordenados = np.sort(columna[validos])
+        if not len(ordenados):
+            continue
+        debajo = np.searchsorted(ordenados, columna[validos], side="left")
+        iguales = np.searchsorted(ordenados, columna[validos], side="right") - debajo
+        pct = (debajo + iguales / 2) / len(ordenados) * 100
+        resultado[validos, j] = 100 - pct if j in menos_es_mejor else pct
+    return resultado
+
+
+class ComparativaJugadores:
+    def __init__(self, jugadores, totales):
+        # totales: jugadores × METRICAS; solo entran los jugadores con PJ > 0
+        pj = totales[:, METRICAS.index("PJ")]
+        jugaron = pj > 0
+        self.jugadores = [j for j, jugo in zip(jugadores, jugaron) if jugo]
+        totales = totales[jugaron].astype(np.float64)
+        pj = pj[jugaron].astype(np.float64)
+        t, e = METRICAS.index("tackles"), METRICAS.index("errados")
+        intentos = totales[:, t] + totales[:, e]
+        tasas = totales[:, [METRICAS.index(m) for m in TASAS]] / pj[:, None]
+        self.metricas = COMPARADAS
+        self.valores = np.column_stack([totales, intentos, _efectividad(totales[:, t], totales[:, e]), tasas])
+        self.percentiles = percentiles(self.valores, {j for j, m in enumerate(COMPARADAS) if m in MENOS_ES_MEJOR})
+        self._pos = {j: i for i, j in enumerate(self.jugadores)}
+
+    def _filas(self, jugadores):
+        return np.array([self._pos[j] for j in jugadores if j in self._pos], dtype=np.intp)
+
+    def tabla(self, jugadores, metricas=None, percentil=False):
+        """Jugadores × métricas (valores o percentiles), en el orden pedido."""
+        filas = self._filas(jugadores)
+        metricas = list(metricas or self.metricas)
+        columnas = [self.metricas.index(m) for m in metricas]
+        origen = self.percentiles if percentil else self.valores
+        return pd.DataFrame(origen[np.ix_(filas, columnas)], columns=metricas,
+                            index=pd.Index([self.jugadores[i] for i in filas], name="nombre del jugador"))
+
+
+def cubo(hechos, huella, grupo=None):
+    """Cubo en la cache compartida, por huella de los datos (se rearma solo cuando cambian las planillas)."""
+    return compartida.obtener(grupo if grupo is not None else huella, "cubo", lambda: CuboTackles(hechos),
+                              version=huella, nombre="cubos")
+
+
+def comparativa(cubo_tackles, huella, grupo=None, partidos=None):
+    """Comparativa de los partidos elegidos (None = todos), en la cache compartida por huella y selección."""
+    def cargar():
+        if partidos is None:
+            totales = cubo_tackles.acumulado[-1] if len(cubo_tackles.partidos) else \
+                np.zeros((len(cubo_tackles.jugadores), len(METRICAS)), dtype=np.int32)
+        else:
+            totales = cubo_tackles.valores[cubo_tackles.mascara(partidos)].sum(axis=0)
+        return ComparativaJugadores(cubo_tackles.jugadores, totales)
+    return compartida.obtener(grupo if grupo is not None else huella,
+                              ("comparativa", None if partidos is None else tuple(partidos)), cargar,
+                              version=huella, nombre="cubos")
@@ -0,0 +1,366 @@
+"""Exporta el tablero de una temporada como sitio estático (HTML + JSON), sin Streamlit.
+
+Uso:
+    python exportar_tablero.py --salida publico/ [--datos data/] [--temporada 2025] [--plantel "TRL B"]
+
+Arma una sola vez el Tablero y cada vista de sección: una página HTML por vista
+con los estilos del tablero (estilo.DASHBOARD_CSS), un único plotly.min.js
+compartido y cada figura en su propio figuras/<nombre>.json, que las páginas
+cargan con tablero.js. La carpeta se sirve con cualquier servidor de archivos
+(los JSON se piden con fetch, así que abrirla como file:// no alcanza).
+"""
+import argparse
+import html
+import json
+import os
+import shutil
+import sys
+import time
+
+import plotly.io as pio
+from plotly.offline import get_plotlyjs
+
+import almacen
+import estilo
+import evolucion
+import graficos
+import informe
+import medicion
+
+RAIZ_DATOS = "data/"
+
+# Vistas exportadas: (nombre en la navegación, archivo)
+VISTAS = [
+    ("Tablero", "index.html"), ("Tackles", "tackles.html"), ("Evolución", "evolucion.html"),
+    ("Penales", "penales.html"), ("Line", "line.html"), ("Scrum", "scrum.html"), ("Salidas", "salidas.html"),
+    ("Salidas 22", "salidas-22.html"), ("Efectividad 22", "efectividad-22.html"), ("Puntos", "puntos.html"),
+]
+
+# Lo que en Streamlit pone el propio framework (tipografía, columnas, navegación)
+_CSS_ESTATICO = """
+<style>
+body{margin:0;font-family:"Source Sans Pro",system-ui,-apple-system,"Segoe UI",sans-serif;color:#31333f;background:#fff}
+.block-container{max-width:1400px;margin:0 auto;padding-left:1rem;padding-right:1rem}
+nav{display:flex;flex-wrap:wrap;gap:4px 14px;padding:10px 1rem;background:#f0f2f6;font-size:15px}
+nav a{color:#31333f;text-decoration:none}
+nav a.activa{font-weight:700;color:#ff4b4b}
+.columnas{display:grid;grid-template-columns:repeat(auto-fit,minmax(280px,1fr));gap:16px;margin-bottom:16px}
+.centrada{width:80%;margin:0 auto}
+.header-row select{min-width:140px;padding:4px;border-radius:6px}
+.metricas{display:flex;gap:48px;margin:8px 0}
+.metricas .lbl{font-size:14px}
+.metricas .val{font-size:36px}
+.aviso{background:#fffce7;border-radius:8px;padding:12px 16px}
+</style>
+"""
+
+# Carga cada figura al entrar en pantalla; los <select> de las tarjetas cambian
+# la figura de su tarjeta (como los selectores del Tablero)
+_JS = """
+(function () {
+  var config = {responsive: true, displayModeBar: false};
+  function dibujar(div) {
+    fetch(div.dataset.figura).then(function (r) { return r.json(); }).then(function (fig) {
+      var layout = Object.assign({}, fig.layout, JSON.parse(div.dataset.layout || "{}"));
+      Plotly.react(div, fig.data, layout, config);
+    });
+  }
+  var visor = new IntersectionObserver(function (entradas) {
+    entradas.forEach(function (e) {
+      if (e.isIntersecting) { visor.unobserve(e.target); dibujar(e.target); }
+    });
+  }, {rootMargin: "200px"});
+  document.querySelectorAll(".figura").forEach(function (div) { visor.observe(div); });
+  document.querySelectorAll("select[data-para]").forEach(function (sel) {
+    sel.addEventListener("change", function () {
+      var div = document.getElementById(sel.dataset.para);
+      div.dataset.figura = sel.value;
+      dibujar(div);
+    });
+  });
+})();
+"""
+
+
+def cargar(raiz=RAIZ_DATOS, temporada=almacen.TEMPORADA, plantel=almacen.PLANTEL):
+    """(datos, huellas, version, problemas) de la temporada/plantel, como los arma el tablero."""
+    carpeta = almacen.carpetas(raiz).get((temporada, plantel))
+    problemas = almacen.importar(carpeta, temporada, plantel) if carpeta else []
+    version = almacen.version(temporada, plantel)
+    hojas = almacen.hojas(temporada, plantel)
+    if not hojas:
+        raise FileNotFoundError(f"no hay Estadistica.xlsx para la temporada {temporada} ({plantel})")
+    datos, huellas = {"hojas": hojas}, {"hojas": version}
+    hechos = almacen.hechos(temporada, plantel)
+    if not hechos.empty:
+        datos["hechos"] = hechos
+        datos["df_sumado"] = almacen.df_sumado(temporada, plantel)
+        huellas["hechos"] = huellas["df_sumado"] = (version, None)
+    return datos, huellas, version, problemas
+
+
+class Sitio:
+    """Páginas y figuras del sitio estático; cada figura se escribe una sola vez."""
+
+    def __init__(self, datos, huellas, grupo=None, version=None):
+        self.datos = datos
+        self.figuras = graficos.Figuras(datos, huellas=huellas, grupo=grupo, version=version)
+        self.json = {}     # archivo -> JSON de la figura
+        self._ids = 0
+
+    def agregar_figura(self, nombre, fig):
+        archivo = f"figuras/{nombre}.json"
+        if archivo not in self.json:
+            self.json[archivo] = pio.to_json(graficos.aligerar(fig), validate=False)
+        return archivo
+
+    def _archivo(self, nombre):
+        fig = self.figuras.get(nombre)
+        return None if fig is None else self.agregar_figura(nombre, fig)
+
+    def figura(self, nombre, layout=None, archivo=None):
+        archivo = archivo or self._archivo(nombre)
+        if archivo is None:
+            return '<p class="aviso">No hay figura para esta opción.</p>'
+        self._ids += 1
+        extra = f" data-layout='{html.escape(json.dumps(layout))}'" if layout else ""
+        return f'<div class="figura" id="fig{self._ids}" data-figura="{archivo}"{extra}></div>'
+
+    def tarjeta(self, titulo, opciones, layout=None):
+        """Tarjeta con título y selector entre figuras ({etiqueta: nombre}), como las del Tablero."""
+        archivos = {etiqueta: self._archivo(nombre) for etiqueta, nombre in opciones.items()}
+        primero = next(iter(archivos.values()))
+        cuerpo = self.figura(None, layout, primero)
+        select = ""
+        if len(opciones) > 1 and primero:
+            select = (f'<select data-para="fig{self._ids}">'
+                      + "".join(f'<option value="{a}">{html.escape(e)}</option>' for e, a in archivos.items() if a)
+                      + "</select>")
+        return (f'<div class="card"><div class="header-row"><h3>{html.escape(titulo)}</h3>{select}</div>'
+                f"{cuerpo}</div>")
+
+
+def _columnas(*celdas):
+    return '<div class="columnas">' + "".join(f"<div>{c}</div>" for c in celdas) + "</div>"
+
+
+def _kpi(label, valor):
+    return f'<div class="kpi"><div class="val">{html.escape(str(valor))}</div><div class="lbl">{html.escape(label)}</div></div>'
+
+
+def _conclusion_22(hojas):
+    efectividad = graficos.preparar_efectividad(hojas)
+    fila_total = efectividad[efectividad["rival"].str.lower() == "total"]
+    if fila_total.empty:
+        return None
+    return (int(fila_total["chances"].values[0]), int(fila_total["concretadas"].values[0]),
+            int(fila_total["%pp"].values[0]))
+
+
+def vista_tablero(sitio):
+    hojas = sitio.datos["hojas"]
+    kpis = informe.kpis_puntos(graficos.fila_puntos(hojas))
+    chico = {"height": 260, "margin": dict(l=20, r=20, t=40, b=10)}
+    partes = [
+        _columnas(_kpi("Puntos a favor", kpis["pf"]), _kpi("Puntos en contra", kpis["pc"]),
+                  _kpi("Diferencia", kpis["dif"]),
+                  _kpi("Puntos promedio por partido", f"{kpis['xp_favor']:.1f} vs {kpis['xp_contra']:.1f}")),
+        _columnas(sitio.tarjeta("Total de puntos", {"Totales": "puntos_bar"}, chico),
+                  sitio.tarjeta("Composición de puntos", {"A favor": "puntos_comp_f", "En contra": "puntos_comp_c"}, chico),
+                  sitio.tarjeta("Precisión (Conv/Pen)", {"Conv/Pen": "puntos_acc"}, chico)),
+    ]
+    conclusion_pen = informe.conclusion_penales(hojas)
+    penales = sitio.tarjeta("Penales", {"Totales": "pen_situaciones", "Ruck": "pen_ruck", "Juego": "pen_juego",
+                                        "Scrum": "pen_scrum"}, chico)
+    if conclusion_pen:
+        penales += f"<p><small>{conclusion_pen}</small></p>"
+    partes.append(_columnas(
+        sitio.tarjeta("Line", {"Totales": "line_total", "Propios": "line_prop", "Rival": "line_rival"}, chico),
+        sitio.tarjeta("Scrum", {"Totales": "scrum_total", "Propios": "scrum_prop", "Rival": "scrum_rival"}, chico),
+        penales,
+    ))
+    efectividad = sitio.tarjeta("Efectividad en 22", {"Serie": "efectividad22"}, chico)
+    total_22 = _conclusion_22(hojas)
+    if total_22:
+        efectividad += (f"<p><small><b>Conclusión:</b> {total_22[0]} chances, {total_22[1]} concretadas → "
+                        f"<b>{total_22[2]}%</b> de efectividad.</small></p>")
+    partes.append(_columnas(
+        sitio.tarjeta("Salidas", {"Totales": "salidas_total", "Propias": "salidas_prop", "Rival": "salidas_rival"}, chico),
+        sitio.tarjeta("Salidas de 22", {"Totales": "salidas22_total", "Propias": "salidas22_prop",
+                                        "Rival": "salidas22_rival"}, chico),
+        efectividad,
+    ))
+    if "df_sumado" in sitio.datos:
+        partes.append('<div class="centrada card"><h4>Tackles totales por jugador</h4>'
+                      + sitio.figura("tackles_total", {"height": 860, "margin": dict(l=140, r=40, t=40, b=10)})
+                      + "</div>")
+    return "".join(partes)
+
+
+def vista_tackles(sitio):
+    if "df_sumado" not in sitio.datos:
+        return '<p class="aviso">No hay planillas de partido cargadas.</p>'
+    return ("<h3>📶 Gráfico de Tackles Totales por Nombre de Jugador</h3>" + sitio.figura("tackles_total")
+            + "<h3>🌐 Efectividad TOTAL de tipos de tackles</h3>" + sitio.figura("tackles_tipos"))
+
+
+def vista_evolucion(sitio, version=None, grupo=None):
+    # Sin sesión no hay selector de jugador: se exporta la serie del equipo
+    hechos = sitio.datos.get("hechos")
+    if hechos is None:
+        return '<p class="aviso">No hay planillas de partido cargadas.</p>'
+    cubo = evolucion.cubo(hechos, version, grupo=grupo)
+    serie = cubo.serie(evolucion.EQUIPO)
+    titulo = evolucion.EQUIPO
+    fig_t = graficos.evolucion_tackles(serie, f"{titulo} – Tackles por fecha")
+    fig_e = graficos.evolucion_efectividad(serie, f"{titulo} – Efectividad de tackle", cubo.ventana)
+    return ("<h3>📈 Tackles y errados por fecha</h3>"
+            + sitio.figura(None, archivo=sitio.agregar_figura("evolucion_tackles", fig_t))
+            + "<h3>🎯 Efectividad por fecha</h3>"
+            + sitio.figura(None, archivo=sitio.agregar_figura("evolucion_efectividad", fig_e)))
+
+
+def vista_penales(sitio):
+    hojas = sitio.datos["hojas"]
+    if graficos.preparar_penales(hojas) is None:
+        return '<p class="aviso">❗ Error: Faltan columnas esperadas en \'Penales\'.</p>'
+    partes = ["<h2>Estadísticas de Penales</h2>", sitio.figura("pen_situaciones")]
+    for situacion, nombre in [("Ruck", "pen_ruck"), ("Juego", "pen_juego"), ("Scrum", "pen_scrum")]:
+        partes += [f"<h3>🔍 Detalle de Penales en {situacion} (por motivo)</h3>", sitio.figura(nombre)]
+    conclusion = informe.conclusion_penales(hojas)
+    if conclusion:
+        partes.append(f"<p>{conclusion}</p>")
+    return "".join(partes)
+
+
+def _vista_donuts(hoja, columnas, titulo, nombres, msg_hoja):
+    def vista(sitio):
+        if graficos.fila_hoja(sitio.datos["hojas"], hoja, columnas) is None:
+            return (f'<p class="aviso">❗ Error: Faltan columnas esperadas o el formato de la hoja '
+                    f"'{msg_hoja}' no es correcto.</p>")
+        return f"<h2>{titulo}</h2>" + _columnas(*(sitio.figura(n) for n in nombres))
+    return vista
+
+
+def vista_efectividad(sitio, plantel):
+    partes = [f"<h2>📈 Efectividad en 22 Rival - {html.escape(plantel)}</h2>", sitio.figura("efectividad22")]
+    total_22 = _conclusion_22(sitio.datos["hojas"])
+    if total_22:
+        partes.append(f"<p><b>Conclusión:</b> {total_22[0]} chances, {total_22[1]} concretadas → "
+                      f"<b>{total_22[2]}%</b>.</p>")
+    return "".join(partes)
+
+
+def vista_puntos(sitio):
+    rowp = graficos.fila_puntos(sitio.datos["hojas"])
+    kpis = informe.kpis_puntos(rowp)
+    conv_f, conv_c, pen_f, pen_c = graficos.precision_puntos(rowp)
+    total = kpis["pf"] + kpis["pc"]
+    share_favor = (kpis["pf"] / total * 100) if total else 0
+    metricas = "".join(f'<div><div class="lbl">{e}</div><div class="val">{v}</div></div>'
+                       for e, v in [("Puntos a favor", kpis["pf"]), ("Puntos en contra", kpis["pc"]),
+                                    ("Diferencia", kpis["dif"])])
+    return (f'<h2>Puntos</h2><div class="metricas">{metricas}</div>' + sitio.figura("puntos_bar")
+            + _columnas(sitio.figura("puntos_comp_f"), sitio.figura("puntos_comp_c")) + sitio.figura("puntos_acc")
+            + f"<p><b>Conclusión:</b> Total de puntos <b>{total}</b> → <b>{kpis['pf']}</b> a favor "
+              f"(≈ <b>{share_favor:.0f}%</b>). Promedios por partido: <b>{kpis['xp_favor']:.1f}</b> vs "
+              f"<b>{kpis['xp_contra']:.1f}</b>. Precisión: conversiones <b>{conv_f:.1f}%</b> vs <b>{conv_c:.1f}%</b>; "
+              f"penales <b>{pen_f:.1f}%</b> vs <b>{pen_c:.1f}%</b>.</p>")
+
+
+ACTIVA = ' class="activa"'
+
+
+def pagina(titulo, vista, contenido):
+    nav = "".join(f'<a href="{archivo}"{ACTIVA if nombre == vista else ""}>{html.escape(nombre)}</a>'
+                  for nombre, archivo in VISTAS)
+    return (f'<!DOCTYPE html>\n<html lang="es"><head><meta charset="utf-8">'
+            f'<meta name="viewport" content="width=device-width, initial-scale=1">'
+            f"<title>{html.escape(titulo)} · {html.escape(vista)}</title>{estilo.DASHBOARD_CSS}{_CSS_ESTATICO}"
+            f'<script src="plotly.min.js"></script></head>'
+            f'<body><nav>{nav}</nav><div class="block-container"><h1>📊 {html.escape(titulo)}</h1>{contenido}</div>'
+            f'<script src="tablero.js"></script></body></html>\n')
+
+
+def armar(datos, huellas, temporada, plantel, version=None):
+    """{archivo relativo: contenido} del sitio completo."""
+    grupo = (temporada, plantel)
+    sitio = Sitio(datos, huellas, grupo, version)
+    vistas = {
+        "Tablero": vista_tablero,
+        "Tackles": vista_tackles,
+        "Evolución": lambda s: vista_evolucion(s, version, grupo),
+        "Penales": vista_penales,
+        "Line": _vista_donuts("Line", graficos.COLUMNAS_LANZAMIENTOS, "Estadísticas de Line",
+                              ["line_total", "line_prop", "line_rival"], "Line"),
+        "Scrum": _vista_donuts("Scrum", graficos.COLUMNAS_LANZAMIENTOS, "Estadísticas de Scrum",
+                               ["scrum_total", "scrum_prop", "scrum_rival"], "Scrum"),
+        "Salidas": _vista_donuts("Salidas", graficos.COLUMNAS_SALIDAS, "Estadísticas de Salidas",
+                                 ["salidas_total", "salidas_prop", "salidas_rival"], "Salidas"),
+        "Salidas 22": _vista_donuts("Salidas de 22", graficos.COLUMNAS_SALIDAS_22, "Estadísticas de Salidas de 22",
+                                    ["salidas22_total", "salidas22_prop", "salidas22_rival"], "Salidas 22"),
+        "Efectividad 22": lambda s: vista_efectividad(s, plantel),
+        "Puntos": vista_puntos,
+    }
+    titulo = f"Dashboard Temporada {temporada} - Club Universitario de Santa Fe"
+    archivos = {}
+    for nombre, archivo in VISTAS:
+        with medicion.etapa(f"exportar:{nombre}"):
+            archivos[archivo] = pagina(titulo, nombre, vistas[nombre](sitio))
+    archivos.update(sitio.json)
+    archivos["tablero.js"] = _JS
+    archivos["plotly.min.js"] = get_plotlyjs()
+    return archivos
+
+
+def escribir(archivos, salida):
+    """Escribe el sitio en una carpeta nueva y la cambia por `salida` (el servidor nunca ve uno a medias)."""
+    nueva = f"{os.path.normpath(salida)}.{os.getpid()}.tmp"
+    shutil.rmtree(nueva, ignore_errors=True)
+    for archivo, contenido in archivos.items():
+        ruta = os.path.join(nueva, archivo)
+        os.makedirs(os.path.dirname(ruta), exist_ok=True)
+        with open(ruta, "w", encoding="utf-8") as f:
+            f.write(contenido)
+    vieja = f"{os.path.normpath(salida)}.{os.getpid()}.viejo"
+    if os.path.exists(salida):
+        os.replace(salida, vieja)
+    os.replace(nueva, salida)
+    shutil.rmtree(vieja, ignore_errors=True)
+
+
+def exportar(salida, raiz=RAIZ_DATOS, temporada=almacen.TEMPORADA, plantel=almacen.PLANTEL):
+    """Arma y escribe el sitio. Devuelve (archivos, bytes, segundos, problemas)."""
+    t0 = time.perf_counter()
+    med = medicion.iniciar(tipo="exportar", temporada=temporada, plantel=plantel)
+    with medicion.etapa("exportar:cargar"):
+        datos, huellas, version, problemas = cargar(raiz, temporada, plantel)
+    archivos = armar(datos, huellas, temporada, plantel, version)
+    with medicion.etapa("exportar:escribir", archivos=len(archivos)):
+        escribir(archivos, salida)
+    medicion.terminar(med)
+    n_bytes = sum(len(c.encode("utf-8")) for c in archivos.values())
+    return len(archivos), n_bytes, time.perf_counter() - t0, problemas
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Exporta el tablero de una temporada como sitio estático.")
+    parser.add_argument("--salida", default="publico", help="carpeta del sitio (default: publico)")
+    parser.add_argument("--datos", default=RAIZ_DATOS, help=f"carpeta de datos (default: {RAIZ_DATOS})")
+    parser.add_argument("--temporada", default=almacen.TEMPORADA)
+    parser.add_argument("--plantel", default=almacen.PLANTEL)
+    args = parser.parse_args(argv)
+    try:
+        n, n_bytes, segundos, problemas = exportar(args.salida, args.datos, args.temporada, args.plantel)
+    except Exception as e:
+        print(f"❌ {args.temporada} {args.plantel}: {e}", file=sys.stderr)
+        return 1
+    for archivo, err in problemas:
+        motivo = err if err is not None else "no contiene una hoja llamada 'Resumen'"
+        print(f"⚠️ {os.path.basename(archivo)}: {motivo}", file=sys.stderr)
+    print(f"✅ {args.salida}: {n} archivos, {n_bytes / 1024:.0f} KB ({segundos:.1f} s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,127 @@
+"""Genera el informe PDF de una o varias carpetas de datos, sin Streamlit.
+
+Uso:
+    python generar_informes.py data/ otra_carpeta/ --salida informes/ --procesos 2
+
+Cada carpeta tiene la misma estructura que data/ (planillas de partido +
+Estadistica.xlsx). Con varias carpetas, cada una se arma en su propio proceso.
+"""
+import argparse
+import hashlib
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import almacen
+import carga
+import graficos
+import informe
+import medicion
+
+
+def ruta_almacen(carpeta):
+    """Almacén propio de cada carpeta (no se mezcla con las temporadas del tablero)."""
+    clave = hashlib.sha1(os.path.abspath(carpeta).encode("utf-8")).hexdigest()[:12]
+    return os.path.join(carga.CARPETA_CACHE, "informes", f"{clave}.sqlite")
+
+
+def cargar_carpeta(carpeta):
+    """(datos, huellas, problemas) de una carpeta, con el mismo almacén que usa el tablero."""
+    ruta = ruta_almacen(carpeta)
+    t, p = almacen.TEMPORADA, almacen.PLANTEL
+    problemas = almacen.importar(carpeta, t, p, ruta=ruta)
+    version = almacen.version(t, p, ruta)
+    datos, huellas = {"hojas": almacen.hojas(t, p, ruta)}, {"hojas": version}
+    hechos = almacen.hechos(t, p, ruta)
+    if not hechos.empty:
+        datos["df_sumado"] = almacen.df_sumado(t, p, ruta)
+        datos["hechos"] = hechos
+        huellas["df_sumado"] = huellas["hechos"] = (version, None)
+    return datos, huellas, problemas
+
+
+def nombre_salida(carpeta):
+    nombre = os.path.normpath(carpeta).strip(os.sep).replace(os.sep, "_") or "data"
+    return f"Informe_{nombre}.pdf"
+
+
+def generar(carpeta, salida, titulo=informe.TITULO_INFORME):
+    """Arma y escribe el PDF de una carpeta. Devuelve (ruta, segundos, problemas)."""
+    t0 = time.perf_counter()
+    med = medicion.iniciar(tipo="cli", carpeta=carpeta)
+    with medicion.etapa("cli:cargar"):
+        datos, huellas, problemas = cargar_carpeta(carpeta)
+    figs = graficos.Figuras(datos, huellas=huellas).varias(graficos.FIGURAS_INFORME)
+    kwargs = informe.argumentos_informe(datos["hojas"], datos.get("df_sumado"),
+                                        titulo.format(carpeta=os.path.basename(os.path.normpath(carpeta))))
+    buf = informe.generar_informe_pdf(figs=figs, **kwargs)
+    os.makedirs(salida, exist_ok=True)
+    ruta = os.path.join(salida, nombre_salida(carpeta))
+    tmp = ruta + f".{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(buf.getvalue())
+    os.replace(tmp, ruta)
+    medicion.terminar(med)
+    return ruta, time.perf_counter() - t0, problemas
+
+
+def _iniciar_proceso():
+    # Ya hay un proceso por carpeta: las planillas se leen en secuencia dentro de cada uno
+    carga.PROCESOS = 1
+
+
+def _generar_en_proceso(carpeta, salida, titulo):
+    try:
+        return generar(carpeta, salida, titulo)
+    finally:
+        informe.cerrar_pool()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Genera el informe PDF de cada carpeta de datos.")
+    parser.add_argument("carpetas", nargs="+", help="carpetas con planillas de partido y Estadistica.xlsx")
+    parser.add_argument("--salida", default="informes", help="carpeta donde se escriben los PDF (default: informes)")
+    parser.add_argument("--titulo", default=informe.TITULO_INFORME,
+                        help="título del informe; admite {carpeta} para el nombre de la carpeta")
+    parser.add_argument("--procesos", type=int, default=0,
+                        help="carpetas en paralelo (0 = una por CPU, hasta la cantidad de carpetas)")
+    args = parser.parse_args(argv)
+
+    procesos = args.procesos or min(len(args.carpetas), os.cpu_count() or 1)
+    fallidas = 0
+    if procesos <= 1:
+        try:
+            resultados = []
+            for carpeta in args.carpetas:
+                try:
+                    resultados.append((carpeta, generar(carpeta, args.salida, args.titulo), None))
+                except Exception as e:
+                    resultados.append((carpeta, None, e))
+        finally:
+            informe.cerrar_pool()
+    else:
+        resultados = []
+        with ProcessPoolExecutor(max_workers=procesos, initializer=_iniciar_proceso) as pool:
+            futuros = {pool.submit(_generar_en_proceso, c, args.salida, args.titulo): c for c in args.carpetas}
+            for futuro in as_completed(futuros):
+                try:
+                    resultados.append((futuros[futuro], futuro.result(), None))
+                except Exception as e:
+                    resultados.append((futuros[futuro], None, e))
+
+    for carpeta, resultado, error in resultados:
+        if error is not None:
+            fallidas += 1
+            print(f"❌ {carpeta}: {error}", file=sys.stderr)
+            continue
+        ruta, segundos, problemas = resultado
+        for archivo, err in problemas:
+            motivo = err if err is not None else "no contiene una hoja llamada 'Resumen'"
+            print(f"⚠️ {carpeta}: {os.path.basename(archivo)}: {motivo}", file=sys.stderr)
+        print(f"✅ {carpeta} -> {ruta} ({segundos:.1f} s)")
+    return 1 if fallidas else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
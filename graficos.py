@@ -0,0 +1,473 @@
+from functools import partial
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+
+import compartida
+import medicion
+
+
+# Registro de figuras: cada figura es un builder con nombre que recibe
+# (datos, modo_celular) y devuelve la figura, o None si faltan datos.
+# `fuentes` son las claves de `datos` de las que depende (para la cache).
+# Las vistas piden solo las figuras que muestran.
+REGISTRO = {}
+
+
+def grafico(nombre, fuentes=("hojas",)):
+    def registrar(fn):
+        REGISTRO[nombre] = (fn, tuple(fuentes))
+        return fn
+    return registrar
+
+
+# Las figuras van a la cache compartida del proceso, clave = (nombre, modo_celular,
+# huellas de sus fuentes), en el grupo/versión de los datos (temporada, plantel).
+# Se guardan los originales y se entregan copias, así el Tablero y el PDF pueden
+# cambiar el layout sin pisarse.
+_SIN_FIGURA = object()
+
+
+def _construir(nombre, datos, modo_celular, huellas, grupo=None, version=None):
+    entrada = REGISTRO.get(nombre)
+    if entrada is None:
+        return None
+    builder, fuentes = entrada
+    if not all(f in huellas for f in fuentes):
+        with medicion.etapa(f"figura:{nombre}", cache="sin_huella"):
+            return builder(datos, modo_celular)
+
+    def cargar():
+        with medicion.etapa(f"figura:{nombre}", cache="fallo"):
+            fig = builder(datos, modo_celular)
+        return _SIN_FIGURA if fig is None else fig
+
+    clave = (nombre, bool(modo_celular), tuple(huellas[f] for f in fuentes))
+    fig = compartida.obtener(grupo, clave, cargar, version=version, nombre="figuras")
+    if fig is _SIN_FIGURA:
+        return None
+    return go.Figure(fig)
+
+
+# Modo liviano (se usa con modo_celular): saca del JSON lo que no cambia el dibujo.
+# La plantilla "streamlit" trae defaults para todos los tipos de traza (~2 KB por
+# figura); se dejan solo los de las trazas presentes y el layout de la plantilla,
+# que el frontend necesita para aplicar el tema.
+_GRUPOS_PX = ("alignmentgroup", "offsetgroup")
+
+
+def aligerar(fig):
+    """Poda en el lugar la figura para enviarla más liviana. Devuelve la misma figura."""
+    if fig is None:
+        return None
+    tipos = {t.type for t in fig.data}
+    plantilla = fig.layout.template
+    if plantilla is not None and plantilla.data is not None:
+        usados = {t: getattr(plantilla.data, t) for t in tipos if getattr(plantilla.data, t, None)}
+        if len(usados) < sum(1 for t in plantilla.data if getattr(plantilla.data, t, None)):
+            fig.layout.template = go.layout.Template(layout=plantilla.layout, data=usados)
+    # Con un solo eje, los grupos que agrega px y los anchor/domain por defecto sobran
+    if len(fig.layout.grid.to_plotly_json()) == 0 and "xaxis2" not in fig.layout:
+        for traza in fig.data:
+            for prop in _GRUPOS_PX:
+                if prop in traza and traza[prop] is not None:
+                    traza[prop] = None
+        for eje, anchor in (("xaxis", "y"), ("yaxis", "x")):
+            if fig.layout[eje].anchor == anchor:
+                fig.layout[eje].anchor = None
+            if fig.layout[eje].domain == (0, 1):
+                fig.layout[eje].domain = None
+    if fig.layout.legend.tracegroupgap == 0:
+        fig.layout.legend.tracegroupgap = None
+    return fig
+
+
+class Figuras:
+    """Acceso perezoso a las figuras del registro: se construyen recién al pedirlas.
+
+    `huellas` mapea cada fuente de `datos` a su huella; si están todas las de una
+    figura, se usa la cache compartida del proceso (en `grupo`, con `version`) y
+    se devuelve una copia.
+    """
+
+    def __init__(self, datos, modo_celular=False, huellas=None, grupo=None, version=None):
+        self.datos = datos
+        self.modo_celular = modo_celular
+        self.huellas = huellas if huellas is not None else {}
+        self.grupo = grupo
+        self.version = version
+        self._hechas = {}
+
+    def get(self, nombre):
+        if nombre not in self._hechas:
+            self._hechas[nombre] = _construir(nombre, self.datos, self.modo_celular, self.huellas,
+                                              self.grupo, self.version)
+        return self._hechas[nombre]
+
+    def varias(self, nombres):
+        return {n: self.get(n) for n in nombres}
+
+
+# Figuras que usa cada vista
+FIGURAS_VISTA = {
+    "Tablero": ["puntos_bar", "puntos_comp_f", "puntos_comp_c", "puntos_acc", "line_total", "line_prop",
+                "line_rival", "scrum_total", "scrum_prop", "scrum_rival", "pen_situaciones", "pen_ruck",
+                "pen_juego", "pen_scrum", "salidas_total", "salidas_prop", "salidas_rival",
+                "salidas22_total", "salidas22_prop", "salidas22_rival", "efectividad22", "tackles_total"],
+    "Tackles": ["tackles_total", "tackles_tipos"],
+    "Penales": ["pen_situaciones", "pen_ruck", "pen_juego", "pen_scrum"],
+    "Line": ["line_total", "line_prop", "line_rival"],
+    "Scrum": ["scrum_total", "scrum_prop", "scrum_rival"],
+    "Salidas": ["salidas_total", "salidas_prop", "salidas_rival"],
+    "Salidas 22": ["salidas22_total", "salidas22_prop", "salidas22_rival"],
+    "Efectividad 22": ["efectividad22"],
+    "Puntos": ["puntos_bar", "puntos_comp_f", "puntos_comp_c", "puntos_acc"],
+}
+FIGURAS_INFORME = [
+    "puntos_bar", "puntos_comp_f", "puntos_comp_c", "puntos_acc",
+    "pen_situaciones", "pen_ruck", "pen_juego", "pen_scrum",
+    "line_total", "line_prop", "line_rival", "scrum_total", "scrum_prop", "scrum_rival",
+    "salidas_total", "salidas_prop", "salidas_rival", "salidas22_total", "salidas22_prop", "salidas22_rival",
+    "efectividad22", "tackles_total",
+]
+
+
+# Tackles
+@grafico("tackles_total", fuentes=("df_sumado",))
+def _tackles_total(datos, modo_celular):
+    df_sumado = datos.get("df_sumado")
+    if df_sumado is None or df_sumado.empty:
+        return None
+    df_melted = df_sumado.melt(id_vars=["nombre del jugador","etiqueta"],
+                               value_vars=["tackles","errados"],
+                               var_name="resultado", value_name="cantidad")
+    df_melted["nombre del jugador"] = pd.Categorical(df_melted["nombre del jugador"],
+                                                     categories=df_sumado["nombre del jugador"], ordered=True)
+    df_melted["texto"] = df_melted["etiqueta"].where(df_melted["resultado"] == "errados", "")
+    fig_total = px.bar(
+        df_melted, y="nombre del jugador", x="cantidad", color="resultado", orientation="h",
+        color_discrete_map={"tackles":"#253094","errados":"#8F1B30"},
+        title="Tackles Totales por Nombre de Jugador", text="texto" if modo_celular else None,
+    )
+    max_total = int(df_sumado["total"].max()); padding = 10
+    fig_total.update_layout(
+        xaxis=dict(title="Cantidad de Tackles", range=[0, max_total + padding], tick0=0, dtick=5),
+        barmode="stack", height=500 if modo_celular else 900, margin=dict(l=180, r=120, t=60, b=80),
+    )
+    if modo_celular:
+        # Modo liviano: la etiqueta va como texto de la barra de errados (al final de la barra
+        # apilada) en vez de una anotación de layout por jugador
+        fig_total.update_traces(text=None, selector=dict(name="tackles"))
+        fig_total.update_traces(textposition="outside", cliponaxis=False, textfont_size=10,
+                                selector=dict(name="errados"))
+        return fig_total
+    fig_total.update_layout(annotations=[
+        dict(x=x, y=y, text=texto, showarrow=False, xanchor="left", yanchor="middle", font=dict(size=10), align="left")
+        for x, y, texto in zip((df_sumado["total"].astype(float) + 0.5).tolist(),
+                               df_sumado["nombre del jugador"].tolist(),
+                               df_sumado["etiqueta"].astype(str).tolist())
+    ])
+    return fig_total
+
+
+@grafico("tackles_tipos", fuentes=("hechos",))
+def _tackles_tipos(datos, modo_celular):
+    hechos = datos.get("hechos")
+    if hechos is None or hechos.empty:
+        return None
+    total_global = {
+        "Positivos": int(hechos["positivos"].sum()),
+        "Neutrales": int(hechos["neutrales"].sum()),
+        "Negativos": int(hechos["negativos"].sum()),
+        "Errados": int(hechos["errados"].sum())
+    }
+    df_global_tipos = pd.DataFrame({"Tipo de Tackle": list(total_global.keys()),
+                                    "Cantidad": list(total_global.values())})
+    fig_global = go.Figure(data=[go.Pie(labels=df_global_tipos["Tipo de Tackle"],
+                                        values=df_global_tipos["Cantidad"],
+                                        hole=0.4,
+                                        marker=dict(colors=["#28A745","#95A5A6","#253094","#8F1B30"]),
+                                        textinfo="label+value+percent", textposition='outside',
+                                        hoverinfo="label+value+percent")])
+    fig_global.update_layout(title="Efectividad Total de Tackles (Totales)",
+                             height=250 if modo_celular else 400,
+                             margin=dict(l=20, r=20, t=50, b=20) if modo_celular else dict(l=80, r=80, t=80, b=50),
+                             legend=dict(orientation="h", x=0.5, xanchor="center", y=-0.15, yanchor="top"),
+                             uniformtext_minsize=7 if modo_celular else 11)
+    return fig_global
+
+
+# Evolución por fecha (jugador o equipo), a partir de evolucion.CuboTackles
+def evolucion_tackles(serie, titulo, modo_celular=False):
+    fig = go.Figure()
+    fig.add_bar(x=serie.index, y=serie["tackles"], name="Tackles", marker_color="#253094")
+    fig.add_bar(x=serie.index, y=serie["errados"], name="Errados", marker_color="#8F1B30")
+    fig.add_scatter(x=serie.index, y=serie["tackles acumulados"], name="Tackles acumulados",
+                    mode="lines+markers", line=dict(color="#28A745"), yaxis="y2")
+    fig.update_layout(
+        title=titulo, barmode="stack", height=350 if modo_celular else 450,
+        yaxis=dict(title="Por partido"), yaxis2=dict(title="Acumulado", overlaying="y", side="right", showgrid=False),
+        legend=dict(orientation="h", x=0.5, xanchor="center", y=-0.2, yanchor="top"),
+        margin=dict(l=20, r=20, t=50, b=20) if modo_celular else dict(l=60, r=60, t=60, b=60),
+    )
+    return fig
+
+
+def evolucion_efectividad(serie, titulo, ventana, modo_celular=False):
+    fig = go.Figure()
+    fig.add_scatter(x=serie.index, y=serie["efectividad"].round(1), name="Por partido",
+                    mode="markers", marker=dict(color="#95A5A6", size=9))
+    fig.add_scatter(x=serie.index, y=serie["efectividad móvil"].round(1), name=f"Móvil ({ventana} fechas)",
+                    mode="lines", line=dict(color="#253094"), connectgaps=True)
+    fig.add_scatter(x=serie.index, y=serie["efectividad acumulada"].round(1), name="Acumulada",
+                    mode="lines", line=dict(color="#28A745", dash="dash"), connectgaps=True)
+    fig.update_layout(
+        title=titulo, height=350 if modo_celular else 450,
+        yaxis=dict(title="Efectividad (%)", range=[0, 105]),
+        legend=dict(orientation="h", x=0.5, xanchor="center", y=-0.2, yanchor="top"),
+        margin=dict(l=20, r=20, t=50, b=20) if modo_celular else dict(l=60, r=60, t=60, b=60),
+    )
+    return fig
+
+
+# Comparativa entre jugadores, a partir de evolucion.ComparativaJugadores
+def comparativa_tasas(tabla, titulo, modo_celular=False):
+    """Barras agrupadas: un grupo por jugador, un color por métrica."""
+    fig = go.Figure()
+    for metrica in tabla.columns:
+        fig.add_bar(x=list(tabla.index), y=tabla[metrica].round(2), name=metrica)
+    fig.update_layout(
+        title=titulo, barmode="group", height=350 if modo_celular else 450,
+        yaxis=dict(title="Por partido jugado"),
+        legend=dict(orientation="h", x=0.5, xanchor="center", y=-0.2, yanchor="top"),
+        margin=dict(l=20, r=20, t=50, b=20) if modo_celular else dict(l=60, r=60, t=60, b=60),
+    )
+    return fig
+
+
+def comparativa_percentiles(tabla, titulo, modo_celular=False):
+    """Mapa de calor jugadores × métricas con el percentil dentro del plantel."""
+    valores = tabla.to_numpy()
+    fig = go.Figure(go.Heatmap(
+        z=valores, x=list(tabla.columns), y=list(tabla.index), zmin=0, zmax=100,
+        colorscale=[[0, "#8F1B30"], [0.5, "#F5F5F5"], [1, "#28A745"]],
+        text=np.where(np.isnan(valores), "", np.char.mod("%.0f", np.nan_to_num(valores))),
+        texttemplate="%{text}", hovertemplate="%{y} · %{x}: percentil %{z:.0f}<extra></extra>",
+        colorbar=dict(title="Percentil"),
+    ))
+    fig.update_layout(
+        title=titulo, height=max(250, 60 + 28 * len(tabla)) if modo_celular else max(350, 90 + 32 * len(tabla)),
+        yaxis=dict(autorange="reversed"),
+        margin=dict(l=20, r=20, t=50, b=20) if modo_celular else dict(l=160, r=60, t=60, b=60),
+    )
+    return fig
+
+
+# Penales
+def preparar_penales(hojas):
+    """Hoja 'Penales' con situacion/motivo normalizados, o None si faltan columnas."""
+    penales = hojas.get("Penales")
+    if penales is None or not {"situacion","propios","rival","motivo"}.issubset(set(penales.columns)):
+        return None
+    penales = penales.copy()
+    penales["situacion"] = penales["situacion"].astype(str).str.strip().str.lower()
+    penales["motivo"]    = penales["motivo"].astype(str).str.strip().str.lower()
+    penales["total"] = penales["propios"] + penales["rival"]
+    return penales
+
+
+@grafico("pen_situaciones")
+def _pen_situaciones(datos, modo_celular):
+    penales = preparar_penales(datos["hojas"])
+    if penales is None:
+        return None
+    situaciones_clave = ["scrum","line","ruck","juego","salida","salida 22"]
+    penales_resumen = penales[penales["situacion"].isin(situaciones_clave)]
+    resumen = penales_resumen.groupby("situacion")[["propios","rival"]].sum().reset_index()
+    return px.bar(resumen, x="situacion", y=["propios","rival"], barmode="group",
+                  labels={"value":"Cantidad","variable":"Tipo"},
+                  color_discrete_map={"propios": "#28A745", "rival": "#C0392B"},
+                  title="Penales Propios y Rivales por Situación", height=500, text_auto=True)
+
+
+def _pen_detalle(datos, modo_celular, situacion, titulo):
+    penales = preparar_penales(datos["hojas"])
+    if penales is None:
+        return None
+    penales_sit = penales[penales["situacion"] == situacion]
+    resumen_sit = penales_sit.melt(id_vars="motivo", value_vars=["propios","rival"], var_name="lado", value_name="cantidad")
+    fig = px.bar(resumen_sit, y="motivo", x="cantidad", color="lado", orientation="h",
+                 labels={"cantidad":"Cantidad","motivo":"Motivo","lado":"Tipo"},
+                 title=titulo,
+                 color_discrete_map={"propios":"#28A745","rival":"#C0392B"}, text="cantidad")
+    fig.update_layout(height=600, margin=dict(l=10, r=10, t=60, b=30))
+    return fig
+
+
+grafico("pen_ruck")(partial(_pen_detalle, situacion="ruck", titulo="Detalle de Penales en Ruck por Motivo"))
+grafico("pen_juego")(partial(_pen_detalle, situacion="juego", titulo="Detalle de Penales en Juego por Motivo"))
+grafico("pen_scrum")(partial(_pen_detalle, situacion="scrum", titulo="Detalle de Penales en Scrum por Motivo"))
+
+
+# Line, Scrum, Salidas, Salidas de 22: donuts ganados/perdidos sobre la fila de totales
+COLUMNAS_LANZAMIENTOS = {
+    "lanzamientos propios","lanzamientos rival","lanzamientos propios ganados","lanzamientos rival ganados",
+    "lanzamientos propios perdidos","lanzamientos rival perdidos","totales ganados","totales perdidos","total"
+}
+COLUMNAS_SALIDAS = {
+    "salidas propias","salidas rival","salidas propias ganadas","salidas rival ganadas","salidas propias perdidas",
+    "salidas rival perdidas","salidas total ganadas","salidas total perdidas","salidas total"
+}
+COLUMNAS_SALIDAS_22 = {
+    "salidas 22 propias","salidas 22 rival","salidas 22 propias ganadas","salidas 22 rival ganadas",
+    "salidas 22 propias perdidas","salidas 22 rival perdidas","salidas 22 total ganadas","salidas 22 total perdidas","salidas 22 total"
+}
+
+
+def fila_hoja(hojas, hoja, columnas):
+    """Primera fila (totales) de la hoja, o None si la hoja no tiene el formato esperado."""
+    df = hojas.get(hoja)
+    if df is None or not columnas.issubset(set(df.columns)):
+        return None
+    return df.iloc[0]
+
+
+def _donut_totales(datos, modo_celular, hoja, columnas, ganados, perdidos, total, titulo, etiquetas, colores):
+    row = fila_hoja(datos["hojas"], hoja, columnas)
+    if row is None:
+        return None
+    data = pd.DataFrame({"Resultado": etiquetas, "Cantidad": [row[ganados], row[perdidos]]})
+    fig = px.pie(data, names="Resultado", values="Cantidad", hole=0.6, color_discrete_sequence=colores)
+    fig.update_traces(textinfo='percent+label+value'); fig.update_layout(title=titulo.format(row[total]))
+    return fig
+
+
+_DONUTS = {
+    "line_total":  ("Line", COLUMNAS_LANZAMIENTOS, "totales ganados", "totales perdidos", "total",
+                    "Line totales (Total {})", ["Ganados","Perdidos"], ["#FF8D2E","#4A50FF"]),
+    "line_prop":   ("Line", COLUMNAS_LANZAMIENTOS, "lanzamientos propios ganados", "lanzamientos propios perdidos",
+                    "lanzamientos propios", "Lanzamientos Propios (Total {})", ["Ganados","Perdidos"], ["#4A50FF","#FF8D2E"]),
+    "line_rival":  ("Line", COLUMNAS_LANZAMIENTOS, "lanzamientos rival ganados", "lanzamientos rival perdidos",
+                    "lanzamientos rival", "Lanzamientos Rival (Total {})", ["Ganados","Perdidos"], ["#4A50FF","#FF8D2E"]),
+    "scrum_total": ("Scrum", COLUMNAS_LANZAMIENTOS, "totales ganados", "totales perdidos", "total",
+                    "Scrum totales (Total {})", ["Ganados","Perdidos"], ["#8E3AC7","#C7693A"]),
+    "scrum_prop":  ("Scrum", COLUMNAS_LANZAMIENTOS, "lanzamientos propios ganados", "lanzamientos propios perdidos",
+                    "lanzamientos propios", "Lanzamientos Propios (Total {})", ["Ganados","Perdidos"], ["#8E3AC7","#C7693A"]),
+    "scrum_rival": ("Scrum", COLUMNAS_LANZAMIENTOS, "lanzamientos rival ganados", "lanzamientos rival perdidos",
+                    "lanzamientos rival", "Lanzamientos Rival (Total {})", ["Ganados","Perdidos"], ["#8E3AC7","#C7693A"]),
+    "salidas_total": ("Salidas", COLUMNAS_SALIDAS, "salidas total ganadas", "salidas total perdidas", "salidas total",
+                      "Salidas Totales (Total {})", ["Ganadas","Perdidas"], ["#7CDED3","#218378"]),
+    "salidas_prop":  ("Salidas", COLUMNAS_SALIDAS, "salidas propias ganadas", "salidas propias perdidas", "salidas propias",
+                      "Salidas Propias (Total {})", ["Ganadas","Perdidas"], ["#7CDED3","#218378"]),
+    "salidas_rival": ("Salidas", COLUMNAS_SALIDAS, "salidas rival ganadas", "salidas rival perdidas", "salidas rival",
+                      "Salidas Rival (Total {})", ["Ganadas","Perdidas"], ["#7CDED3","#218378"]),
+    "salidas22_total": ("Salidas de 22", COLUMNAS_SALIDAS_22, "salidas 22 total ganadas", "salidas 22 total perdidas",
+                        "salidas 22 total", "Salidas de 22 Totales (Total {})", ["Ganadas","Perdidas"], ["#7DBADE","#215F83"]),
+    "salidas22_prop":  ("Salidas de 22", COLUMNAS_SALIDAS_22, "salidas 22 propias ganadas", "salidas 22 propias perdidas",
+                        "salidas 22 propias", "Salidas de 22 Propias (Total {})", ["Ganadas","Perdidas"], ["#7DBADE","#215F83"]),
+    "salidas22_rival": ("Salidas de 22", COLUMNAS_SALIDAS_22, "salidas 22 rival ganadas", "salidas 22 rival perdidas",
+                        "salidas 22 rival", "Salidas de 22 Rival (Total {})", ["Ganadas","Perdidas"], ["#7DBADE","#215F83"]),
+}
+for _nombre, _args in _DONUTS.items():
+    grafico(_nombre)(partial(_donut_totales, **dict(zip(
+        ["hoja","columnas","ganados","perdidos","total","titulo","etiquetas","colores"], _args))))
+
+
+# Efectividad en 22 rival
+def preparar_efectividad(hojas):
+    efectividad = hojas["Efectividad 22"].copy()
+    efectividad["partido"] = range(1, len(efectividad) + 1)
+    efectividad["etiqueta"] = efectividad["partido"].astype(str) + " - " + efectividad["rival"]
+    return efectividad
+
+
+@grafico("efectividad22")
+def _efectividad22(datos, modo_celular):
+    efectividad = preparar_efectividad(datos["hojas"])
+    efectividad_sin_total = efectividad[efectividad["rival"].str.lower() != "total"]
+    fig_eff = px.line(
+        efectividad_sin_total, x="rival", y=["concretadas","chances"], markers=True,
+        labels={"value":"Cantidad","variable":"Tipo de Acción","rival":"Rival"},
+        title="Acciones Concretadas vs Chances en 22 Rival",
+        color_discrete_map={"concretadas":"#F4B400","chances":"#DB4437"}
+    )
+    fig_eff.update_layout(height=500, yaxis=dict(title="Cantidad"), xaxis=dict(title="Rival"),
+                          legend_title="Tipo", margin=dict(l=40, r=40, t=60, b=40))
+    return fig_eff
+
+
+# Puntos
+def fila_puntos(hojas):
+    return hojas["Puntos"].iloc[0]
+
+
+@grafico("puntos_bar")
+def _puntos_bar(datos, modo_celular):
+    rowp = fila_puntos(datos["hojas"])
+    pf = int(rowp["puntos_favor"]); pc = int(rowp["puntos_contra"]); total = pf + pc
+    share_favor = (pf/total*100) if total else 0
+    bar_100 = pd.DataFrame({"Tipo":["Puntos"], "A favor":[pf], "En contra":[pc]})
+    fig_bar = px.bar(bar_100.melt(id_vars="Tipo", var_name="Lado", value_name="Puntos"),
+                     x="Tipo", y="Puntos", color="Lado",
+                     color_discrete_map={"A favor":"#2E86DE","En contra":"#EB4D8A"},
+                     text="Puntos")
+    fig_bar.update_layout(title=f"Total de puntos – {share_favor:.0f}% a favor",
+                          barmode="relative", height=240 if modo_celular else 300,
+                          yaxis=dict(range=[0,total]), margin=dict(l=40, r=40, t=60, b=20))
+    return fig_bar
+
+
+def puntos_componentes(rowp, prefix):
+    tries = int(rowp[f"tries_{prefix}"]); conv_m = int(rowp[f"conv_{prefix}_m"]); pen_m = int(rowp[f"pen_{prefix}_m"])
+    drops = int(rowp.get(f"drops_{prefix}",0))
+    return {"Tries (x5)":tries*5, "Conversiones (x2)":conv_m*2, "Penales (x3)":pen_m*3, "Drops (x3)":drops*3}
+
+
+def _puntos_comp(datos, modo_celular, prefix, titulo):
+    comp = puntos_componentes(fila_puntos(datos["hojas"]), prefix)
+    df_comp = pd.DataFrame({"Componente": list(comp.keys()), "Puntos": list(comp.values())})
+    f = px.pie(df_comp, names="Componente", values="Puntos", hole=0.5, title=titulo)
+    f.update_layout(
+        title=dict(y=0.98, x=0.5),
+        margin=dict(l=20, r=20, t=42, b=24),
+        legend=dict(orientation="h", x=0.5, xanchor="center", y=-0.16, yanchor="top")
+    )
+    f.update_traces(textinfo="percent+label+value")
+    f.update_layout(height=260 if modo_celular else 320, margin=dict(l=20,r=20,t=60,b=20))
+    return f
+
+
+grafico("puntos_comp_f")(partial(_puntos_comp, prefix="favor", titulo="Composición de puntos A FAVOR"))
+grafico("puntos_comp_c")(partial(_puntos_comp, prefix="contra", titulo="Composición de puntos EN CONTRA"))
+
+
+def precision_puntos(rowp):
+    conv_f = (rowp["conv_favor_m"]/rowp["conv_favor_t"]*100) if rowp["conv_favor_t"] else 0
+    conv_c = (rowp["conv_contra_m"]/rowp["conv_contra_t"]*100) if rowp["conv_contra_t"] else 0
+    pen_f  = (rowp["pen_favor_m"]/rowp["pen_favor_t"]*100) if rowp["pen_favor_t"] else 0
+    pen_c  = (rowp["pen_contra_m"]/rowp["pen_contra_t"]*100) if rowp["pen_contra_t"] else 0
+    return conv_f, conv_c, pen_f, pen_c
+
+
+@grafico("puntos_acc")
+def _puntos_acc(datos, modo_celular):
+    rowp = fila_puntos(datos["hojas"])
+    conv_f, conv_c, pen_f, pen_c = precision_puntos(rowp)
+    acc_df = pd.DataFrame({"Métrica":["Conversiones","Penales"], "A favor":[round(conv_f,1), round(pen_f,1)], "En contra":[round(conv_c,1), round(pen_c,1)]})
+    labels = {
+        ("Conversiones","A favor"):f"{int(rowp['conv_favor_m'])}/{int(rowp['conv_favor_t'])}",
+        ("Conversiones","En contra"):f"{int(rowp['conv_contra_m'])}/{int(rowp['conv_contra_t'])}",
+        ("Penales","A favor"):f"{int(rowp['pen_favor_m'])}/{int(rowp['pen_favor_t'])}",
+        ("Penales","En contra"):f"{int(rowp['pen_contra_m'])}/{int(rowp['pen_contra_t'])}",
+    }
+    acc_long = acc_df.melt(id_vars="Métrica", var_name="Lado %", value_name="Precisión (%)"); acc_long["Lado"] = acc_long["Lado %"].str.replace(" %","",regex=False)
+    acc_long["label"] = acc_long.apply(lambda r: labels[(r["Métrica"], r["Lado"])], axis=1)
+    fig_acc = px.bar(acc_long, x="Métrica", y="Precisión (%)", color="Lado", barmode="group",
+                     color_discrete_map={"A favor":"#2E86DE","En contra":"#EB4D8A"}, text="label",
+                     title="Precisión: Conversiones y Penales")
+    fig_acc.update_traces(textposition="outside", texttemplate="%{text} (%{y:.1f}%)", cliponaxis=False)
+    fig_acc.update_layout(height=260 if modo_celular else 320, yaxis=dict(title="Precisión (%)", range=[0,100]),
+                          margin=dict(l=40, r=40, t=60, b=20))
+    return fig_acc
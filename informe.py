@@ -0,0 +1,543 @@
+import asyncio
+import hashlib
+import io
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import plotly.io as pio
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.utils import ImageReader
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, PageBreak, Flowable
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib import colors
+
+import carga
+import graficos
+import medicion
+
+try:
+    import kaleido
+    HAY_KALEIDO_POOL = hasattr(kaleido, "Kaleido")  # kaleido >= 1 (Chromium con varias pestañas)
+except ImportError:
+    HAY_KALEIDO_POOL = False
+
+
+# Render en lote: todas las figuras del PDF se mandan juntas a un Chromium
+# persistente con varias pestañas; el PDF se arma cuando vuelven todos los PNG.
+KALEIDO_TABS = int(os.environ.get("DASHBOARD_KALEIDO_TABS", "4"))
+
+# Cache de PNG en disco, direccionada por contenido: clave = hash del JSON de la
+# figura (ya con el estilo del PDF aplicado) + ancho, alto y escala. Se poda por
+# LRU (mtime, que se actualiza en cada acierto) cuando supera el tope.
+CARPETA_PNG = os.path.join(carga.CARPETA_CACHE, "png")
+MAX_MB_PNG = float(os.environ.get("DASHBOARD_CACHE_PNG_MB", "200"))
+
+
+class _PoolKaleido:
+    """Kaleido abierto una sola vez en un event loop propio, compartido por todos los informes."""
+
+    def __init__(self, n):
+        self._loop = asyncio.new_event_loop()
+        self._hilo = threading.Thread(target=self._loop.run_forever, daemon=True)
+        self._hilo.start()
+        self._kaleido = kaleido.Kaleido(n=n)
+        try:
+            self._ejecutar(self._kaleido.__aenter__())
+        except BaseException:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            raise
+
+    def _ejecutar(self, coro):
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+
+    async def _uno(self, fig_dict, opts, al_terminar):
+        t0 = time.perf_counter()
+        png = await self._kaleido.calc_fig(fig_dict, opts=opts)
+        al_terminar()
+        return png, time.perf_counter() - t0
+
+    def renderizar(self, trabajos, al_terminar=lambda: None):
+        async def lote():
+            return await asyncio.gather(*[self._uno(f, o, al_terminar) for f, o in trabajos])
+        return self._ejecutar(lote())
+
+    def cerrar(self):
+        try:
+            self._ejecutar(self._kaleido.__aexit__(None, None, None))
+        finally:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+
+
+_pool = None
+_lock_pool = threading.Lock()
+
+
+def pool_kaleido():
+    global _pool
+    with _lock_pool:
+        if _pool is None:
+            _pool = _PoolKaleido(KALEIDO_TABS)
+        return _pool
+
+
+def cerrar_pool():
+    """Cierra el Chromium de Kaleido si se abrió (para scripts que terminan)."""
+    global _pool
+    with _lock_pool:
+        if _pool is not None:
+            _pool.cerrar()
+            _pool = None
+
+
+def _opts(w, h, scale):
+    return dict(format="png", width=w, height=h, scale=scale)
+
+
+def _png_simple(fig_dict, opts):
+    t0 = time.perf_counter()
+    png = pio.to_image(fig_dict, format="png", width=opts["width"], height=opts["height"], scale=opts["scale"])
+    return png, time.perf_counter() - t0
+
+
+def _renderizar_lote(trabajos, al_terminar=lambda: None):
+    if not trabajos:
+        return []
+    if HAY_KALEIDO_POOL:
+        return pool_kaleido().renderizar(trabajos, al_terminar)
+
+    # kaleido viejo: un proceso por llamada, se reparten en hilos
+    def uno(t):
+        res = _png_simple(*t)
+        al_terminar()
+        return res
+    with ThreadPoolExecutor(max_workers=KALEIDO_TABS) as ex:
+        return list(ex.map(uno, trabajos))
+
+
+def clave_png(fig_dict, opts):
+    h = hashlib.sha256(pio.to_json(fig_dict, validate=False).encode("utf-8"))
+    h.update(f"|{opts['width']}x{opts['height']}@{opts['scale']}".encode("ascii"))
+    return h.hexdigest()
+
+
+def _leer_png(clave):
+    ruta = os.path.join(CARPETA_PNG, clave + ".png")
+    try:
+        with open(ruta, "rb") as f:
+            png = f.read()
+        os.utime(ruta)
+        return png
+    except OSError:
+        return None
+
+
+def _guardar_png(clave, png):
+    try:
+        os.makedirs(CARPETA_PNG, exist_ok=True)
+        ruta = os.path.join(CARPETA_PNG, clave + ".png")
+        tmp = ruta + f".{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(png)
+        os.replace(tmp, ruta)
+    except OSError:
+        pass
+
+
+def podar_cache_png(max_mb=None):
+    """Borra los PNG menos usados hasta quedar debajo del tope."""
+    tope = (MAX_MB_PNG if max_mb is None else max_mb) * 1024 * 1024
+    try:
+        entradas = [e for e in os.scandir(CARPETA_PNG) if e.name.endswith(".png")]
+    except OSError:
+        return
+    stats = sorted(((e.stat().st_mtime, e.stat().st_size, e.path) for e in entradas), reverse=True)
+    total = 0
+    for _, tamanio, ruta in stats:
+        total += tamanio
+        if total > tope:
+            try:
+                os.remove(ruta)
+            except OSError:
+                pass
+
+
+def renderizar_pngs(pedidos, usar_cache=True, al_avanzar=None):
+    """pedidos: [(fig, w, h, scale)] -> [(png, segundos)] en el mismo orden.
+
+    Solo se renderizan las figuras que no están en la cache de PNG.
+    `al_avanzar(hechas, total)` se llama cada vez que una figura queda lista.
+    """
+    with medicion.etapa("png:serializar", figuras=len(pedidos)):
+        trabajos = [(fig.to_dict(), _opts(w, h, scale)) for fig, w, h, scale in pedidos]
+    hechas = [0]
+    lock = threading.Lock()
+
+    def al_terminar(n=1):
+        with lock:
+            hechas[0] += n
+            if al_avanzar is not None:
+                al_avanzar(hechas[0], len(trabajos))
+
+    if not usar_cache:
+        with medicion.etapa("png:kaleido", figuras=len(trabajos)):
+            return _renderizar_lote(trabajos, al_terminar)
+
+    resultados = [None] * len(trabajos)
+    claves = [clave_png(f, o) for f, o in trabajos]
+    faltan = []
+    for i, clave in enumerate(claves):
+        t0 = time.perf_counter()
+        png = _leer_png(clave)
+        medicion.contar("png", png is not None)
+        if png is None:
+            faltan.append(i)
+        else:
+            resultados[i] = (png, time.perf_counter() - t0)
+    al_terminar(len(trabajos) - len(faltan))
+    if faltan:
+        with medicion.etapa("png:kaleido", figuras=len(faltan)):
+            renderizados = _renderizar_lote([trabajos[i] for i in faltan], al_terminar)
+        for i, res in zip(faltan, renderizados):
+            resultados[i] = res
+            _guardar_png(claves[i], res[0])
+        podar_cache_png()
+    return resultados
+
+
+class _ImagenPendiente(Flowable):
+    """Lugar reservado para una figura; el PNG se completa antes de doc.build."""
+
+    def __init__(self, width, height):
+        super().__init__()
+        self.width, self.height = width, height
+        self.hAlign = "CENTER"
+        self.png = None
+
+    def wrap(self, availWidth, availHeight):
+        return self.width, self.height
+
+    def draw(self):
+        self.canv.drawImage(ImageReader(io.BytesIO(self.png)), 0, 0, self.width, self.height)
+
+
+# REPORTLAB, creacion del PDF
+def tabla_tackles_pdf(df_sumado):
+    data_tabla = [["Jugador","Tackles","Errados","Efectividad (%)","PJ"]]
+    data_tabla += [list(fila) for fila in zip(
+        df_sumado["nombre del jugador"].tolist(), df_sumado["tackles"].astype(int).tolist(),
+        df_sumado["errados"].astype(int).tolist(), (df_sumado["porcentaje"].astype(str) + "%").tolist(),
+        df_sumado["PJ"].astype(int).tolist(),
+    )]
+    tabla = Table(data_tabla, repeatRows=1, hAlign="LEFT")
+    tabla.setStyle(TableStyle([
+        ("BACKGROUND",(0,0),(-1,0),colors.HexColor("#253094")),
+        ("TEXTCOLOR",(0,0),(-1,0),colors.whitesmoke),
+        ("ALIGN",(0,0),(-1,-1),"CENTER"),
+        ("GRID",(0,0),(-1,-1),0.5,colors.black),
+        ("FONTSIZE",(0,0),(-1,-1),8),
+    ]))
+    return tabla
+
+
+# Textos, KPIs y tablas del informe a partir de los datos (los usa el tablero y la CLI)
+def titulo_temporada(temporada, plantel=None):
+    return f"Informe Anual – Universitario {temporada}" + (f" – {plantel}" if plantel else "")
+
+
+TITULO_INFORME = titulo_temporada("2025")
+
+
+def kpis_puntos(rowp):
+    pf = int(rowp["puntos_favor"]); pc = int(rowp["puntos_contra"])
+    partidos = int(rowp["partidos"])
+    return dict(pf=pf, pc=pc, dif=pf - pc, partidos=partidos,
+                xp_favor=rowp["puntos_favor"]/partidos, xp_contra=rowp["puntos_contra"]/partidos)
+
+
+def tabla_puntos(rowp):
+    return [
+        ["Item","A favor","En contra"],
+        ["Tries", int(rowp.get("tries_favor", 0)), int(rowp.get("tries_contra", 0))],
+        ["Conversiones",
+             f"{int(rowp.get('conv_favor_m', 0))}/{int(rowp.get('conv_favor_t', 0))}",
+             f"{int(rowp.get('conv_contra_m', 0))}/{int(rowp.get('conv_contra_t', 0))}"],
+        ["Penales",
+             f"{int(rowp.get('pen_favor_m', 0))}/{int(rowp.get('pen_favor_t', 0))}",
+             f"{int(rowp.get('pen_contra_m', 0))}/{int(rowp.get('pen_contra_t', 0))}"],
+        ["Drops", int(rowp.get("drops_favor", 0)), int(rowp.get("drops_contra", 0))],
+        ["Puntos", int(rowp["puntos_favor"]), int(rowp["puntos_contra"])],
+    ]
+
+
+def conclusion_penales(hojas, penales=None):
+    """Texto (con <b>) del promedio de penales propios por partido, o None sin hoja 'Penales'."""
+    if penales is None:
+        penales = graficos.preparar_penales(hojas)
+    if penales is None:
+        return None
+    fila_tot = penales["situacion"].astype(str).str.lower().str.contains("penales totales", na=False)
+    if fila_tot.any():
+        total_pen_propios = int(penales.loc[fila_tot, "propios"].iloc[0])
+    else:
+        total_pen_propios = int(penales["propios"].fillna(0).sum())
+    info_df = hojas["Info"]
+    partidos_pen = int(info_df.loc[info_df["variable"].astype(str).str.lower() == "cantidad_partidos", "valor"].iloc[0])
+    prom_pen = total_pen_propios / partidos_pen if partidos_pen else 0
+    return (
+        f"Cometimos un total de <b>{total_pen_propios}</b> penales en <b>{partidos_pen}</b> partidos "
+        f"que da un promedio de <b>{prom_pen:.1f}</b> por partido."
+    )
+
+
+def conclusion_22(hojas):
+    efectividad = graficos.preparar_efectividad(hojas)
+    fila_total = efectividad[efectividad["rival"].str.lower() == "total"]
+    if fila_total.empty:
+        return None
+    return (
+        f" Conclusión: Hubo un total de {int(fila_total['chances'].values[0])} chances y se concretaron "
+        f"{int(fila_total['concretadas'].values[0])}, dando una efectividad del "
+        f"{int(fila_total['%pp'].values[0])}% en zona de 22 rival."
+    )
+
+
+def argumentos_informe(hojas, df_sumado=None, titulo=TITULO_INFORME):
+    """kwargs de generar_informe_pdf (todo menos las figuras)."""
+    rowp = graficos.fila_puntos(hojas)
+    return dict(
+        titulo=titulo,
+        kpis=kpis_puntos(rowp),
+        tabla_puntos=tabla_puntos(rowp),
+        tackles_tabla=tabla_tackles_pdf(df_sumado) if df_sumado is not None else None,
+        conclusion_22=conclusion_22(hojas),
+        conclusion_penales=conclusion_penales(hojas),
+    )
+
+
+def generar_informe_pdf(
+    titulo="Informe Club Universitario – TRL B - 2025",
+    kpis=None, tabla_puntos=None, figs=None,
+    tackles_tabla=None, conclusion_22=None, conclusion_penales=None,
+    tiempos=None, progreso=None,
+):
+    """Arma el PDF. Si se pasa `tiempos` (dict), se completa con los segundos de render de cada figura.
+
+    `progreso(etapa, hechas, total)` recibe "figuras" mientras se renderiza y "pdf" al armar.
+    """
+    if kpis is None: kpis = {}
+    if figs is None: figs = {}
+    buf_pdf = io.BytesIO()
+    doc = SimpleDocTemplate(buf_pdf, pagesize=A4, leftMargin=28, rightMargin=28, topMargin=28, bottomMargin=28)
+    S = getSampleStyleSheet()
+    H1 = ParagraphStyle("H1", parent=S["Heading1"], spaceAfter=8)
+    H2 = ParagraphStyle("H2", parent=S["Heading2"], spaceBefore=8, spaceAfter=6)
+    P  = ParagraphStyle("P",  parent=S["BodyText"], leading=14)
+
+    PAGE_W, _ = A4
+    USABLE_W = PAGE_W - (28 + 28)
+
+    def colw(n, gap=8):
+        return (USABLE_W - gap*(n-1)) / n
+
+    W_FULL  = USABLE_W
+    W_HALF  = colw(2)
+    W_THIRD = colw(3) * 1.1
+
+    def _for_pdf(fig, title_size=12, top=28, base_font=12, tick=11):
+        fig.update_layout(
+            margin=dict(l=0, r=0, t=top, b=6),
+            title=dict(font=dict(size=title_size)),
+            font=dict(size=base_font),
+            legend=dict(orientation="h", x=0.5, xanchor="center", y=-0.18, yanchor="top"),
+            xaxis=dict(tickfont=dict(size=tick)),
+            yaxis=dict(tickfont=dict(size=tick)),
+        )
+        return fig
+
+    # Las figuras se piden acá y se renderizan todas juntas antes de doc.build
+    pedidos, pendientes = [], []
+
+    def fig_to_img(nombre, w=1200, h=700, scale=2, width_pt=180):
+        fig = _for_pdf(figs[nombre])
+        fig.update_layout(paper_bgcolor="white", plot_bgcolor="white", template="plotly_white")
+        img = _ImagenPendiente(width_pt, width_pt * (h / w))
+        pedidos.append((fig, w, h, scale))
+        pendientes.append((nombre, img))
+        return img
+
+    story = []
+    story.append(Paragraph(titulo, H1))
+    story.append(Spacer(1, 6))
+
+    if kpis:
+        kpi_txt = (f"<b>Puntos:</b> {kpis.get('pf',0)} a favor · {kpis.get('pc',0)} en contra · "
+                   f"dif: {kpis.get('dif',0)} · XP: {kpis.get('xp_favor',0):.1f} vs {kpis.get('xp_contra',0):.1f} "
+                   f"({kpis.get('partidos',0)} PJ)")
+        story.append(Paragraph(kpi_txt, P))
+        story.append(Spacer(1, 8))
+
+    row_imgs = [fig_to_img(n, width_pt=W_THIRD) for n in ["puntos_bar", "puntos_comp_f", "puntos_comp_c"] if figs.get(n)]
+
+    if row_imgs:
+        story.append(Paragraph("Puntos", H1))
+        story.append(Table([row_imgs], colWidths=[W_THIRD]*len(row_imgs), hAlign="CENTER",
+                           style=[("LEFTPADDING",(0,0),(-1,-1),0), ("RIGHTPADDING",(0,0),(-1,-1),0)]))
+        story.append(Spacer(1, 6))
+
+    if figs.get("puntos_acc"):
+        story.append(Table([[fig_to_img("puntos_acc", width_pt=W_FULL)]],
+                           colWidths=[W_FULL], hAlign="CENTER",
+                           style=[("LEFTPADDING",(0,0),(-1,-1),0), ("RIGHTPADDING",(0,0),(-1,-1),0)]))
+        story.append(Spacer(1, 8))
+
+    if tabla_puntos:
+        t = Table(tabla_puntos, hAlign="CENTER")
+        t.setStyle(TableStyle([
+            ("BACKGROUND",(0,0),(-1,0),colors.HexColor("#222")),
+            ("TEXTCOLOR",(0,0),(-1,0),colors.whitesmoke),
+            ("GRID",(0,0),(-1,-1),0.4,colors.grey),
+            ("ALIGN",(0,0),(-1,-1),"CENTER"),
+            ("VALIGN",(0,0),(-1,-1),"MIDDLE"),
+        ]))
+        story.append(t); story.append(Spacer(1, 8))
+
+    pen_imgs = [fig_to_img(n, width_pt=W_HALF) for n in ["pen_situaciones", "pen_ruck", "pen_juego", "pen_scrum"] if figs.get(n)]
+    if pen_imgs:
+        story.append(Paragraph("Penales", H2))
+        rows = [pen_imgs[i:i+2] for i in range(0, len(pen_imgs), 2)]
+        for r in rows:
+            story.append(Table([r], colWidths=[W_HALF]*len(r), hAlign="CENTER",
+                               style=[("LEFTPADDING",(0,0),(-1,-1),0), ("RIGHTPADDING",(0,0),(-1,-1),0)]))
+            story.append(Spacer(1, 6))
+    if conclusion_penales:
+        story.append(Spacer(1, 4)); story.append(Paragraph(conclusion_penales, P)); story.append(Spacer(1, 8))
+
+    for titulo_secc, trio in [
+        ("Line",          ["line_total", "line_prop", "line_rival"]),
+        ("Scrum",         ["scrum_total", "scrum_prop", "scrum_rival"]),
+        ("Salidas",       ["salidas_total", "salidas_prop", "salidas_rival"]),
+        ("Salidas de 22", ["salidas22_total", "salidas22_prop", "salidas22_rival"]),
+    ]:
+        trio = [fig_to_img(n, width_pt=W_THIRD) for n in trio if figs.get(n)]
+        if trio:
+            story.append(Paragraph(titulo_secc, H2))
+            story.append(Table([trio], colWidths=[W_THIRD]*len(trio), hAlign="CENTER",
+                               style=[("LEFTPADDING",(0,0),(-1,-1),0), ("RIGHTPADDING",(0,0),(-1,-1),0)]))
+            story.append(Spacer(1, 6))
+
+    if figs.get("efectividad22"):
+        story.append(Paragraph("Efectividad en 22 Rival", H2))
+        story.append(fig_to_img("efectividad22", width_pt=W_FULL))
+        story.append(Spacer(1, 6))
+        if conclusion_22:
+            story.append(Paragraph(conclusion_22, P)); story.append(Spacer(1, 8))
+
+    if tackles_tabla is not None:
+        story.append(Paragraph("Tackles Totales por jugador", H2)); story.append(tackles_tabla); story.append(Spacer(1, 12))
+    elif figs.get("tackles_total"):
+        story.append(Paragraph("Tackles Totales por jugador", H2))
+        story.append(fig_to_img("tackles_total", width_pt=W_FULL))
+        story.append(Spacer(1, 8))
+
+    story.append(PageBreak())
+    story.append(Paragraph("Generado automáticamente desde el dashboard de Universitario.", P))
+
+    al_avanzar = (lambda hechas, total: progreso("figuras", hechas, total)) if progreso else None
+    if progreso:
+        progreso("figuras", 0, len(pedidos))
+    for (nombre, img), (png, segundos) in zip(pendientes, renderizar_pngs(pedidos, al_avanzar=al_avanzar)):
+        img.png = png
+        medicion.agregar(f"png:{nombre}", segundos)
+        if tiempos is not None:
+            tiempos[nombre] = segundos
+    if progreso:
+        progreso("pdf", len(pedidos), len(pedidos))
+    with medicion.etapa("pdf:build"):
+        doc.build(story)
+    buf_pdf.seek(0)
+    return buf_pdf
+
+
+# Informes en segundo plano: cada pedido es un trabajo con id, progreso y el PDF
+# final. Pedidos iguales (misma clave) mientras uno está en curso, o ya resuelto,
+# devuelven el mismo trabajo en lugar de arrancar otro.
+MAX_TRABAJOS = 8
+_trabajos = {}
+_lock_trabajos = threading.Lock()
+_ejecutor_informes = ThreadPoolExecutor(max_workers=2, thread_name_prefix="informe")
+
+
+class TrabajoInforme:
+    def __init__(self, id_trabajo):
+        self.id = id_trabajo
+        self.etapa = "cola"      # cola -> figuras -> pdf -> listo | error
+        self.hechas = 0
+        self.total = 0
+        self.pdf = None
+        self.error = None
+        self.tiempos = {}
+        self.inicio = time.perf_counter()
+        self.segundos = None
+
+    def progreso(self, etapa, hechas, total):
+        self.etapa, self.hechas, self.total = etapa, hechas, total
+
+    @property
+    def terminado(self):
+        return self.etapa in ("listo", "error")
+
+    @property
+    def fraccion(self):
+        if self.etapa in ("pdf", "listo"):
+            return 1.0
+        return self.hechas / self.total if self.total else 0.0
+
+    def texto(self):
+        if self.etapa == "cola":
+            return "En cola…"
+        if self.etapa == "figuras":
+            return f"Renderizando figuras {self.hechas}/{self.total}"
+        if self.etapa == "pdf":
+            return "Armando PDF…"
+        if self.etapa == "error":
+            return f"Error: {self.error}"
+        return f"Listo en {self.segundos:.1f} s"
+
+
+def _correr(trabajo, kwargs, armar_figs):
+    med = medicion.iniciar(tipo="informe", id=trabajo.id)
+    try:
+        with medicion.etapa("informe:figuras"):
+            figs = armar_figs() if armar_figs is not None else kwargs.pop("figs", None)
+        buf = generar_informe_pdf(figs=figs, tiempos=trabajo.tiempos, progreso=trabajo.progreso, **kwargs)
+        trabajo.pdf = buf.getvalue()
+        trabajo.etapa = "listo"
+    except Exception as e:
+        trabajo.error = str(e)
+        trabajo.etapa = "error"
+    trabajo.segundos = time.perf_counter() - trabajo.inicio
+    med.contexto.update(estado=trabajo.etapa, error=trabajo.error)
+    medicion.terminar(med)
+
+
+def lanzar_informe(clave, kwargs, armar_figs=None):
+    """Arranca (o reutiliza) el trabajo de la clave dada. `armar_figs` corre en el hilo del trabajo."""
+    id_trabajo = hashlib.sha1(repr(clave).encode("utf-8")).hexdigest()[:12]
+    with _lock_trabajos:
+        trabajo = _trabajos.get(id_trabajo)
+        if trabajo is not None and trabajo.etapa != "error":
+            return trabajo
+        trabajo = TrabajoInforme(id_trabajo)
+        _trabajos[id_trabajo] = trabajo
+        terminados = [t for t in _trabajos.values() if t.terminado]
+        for viejo in terminados[:max(0, len(_trabajos) - MAX_TRABAJOS)]:
+            _trabajos.pop(viejo.id, None)
+    _ejecutor_informes.submit(_correr, trabajo, dict(kwargs), armar_figs)
+    return trabajo
+
+
+def obtener_trabajo(id_trabajo):
+    with _lock_trabajos:
+        return _trabajos.get(id_trabajo)
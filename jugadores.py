@@ -0,0 +1,87 @@
+import os
+import threading
+import unicodedata
+
+import numpy as np
+import pandas as pd
+
+
+# Tabla de alias opcional en la carpeta de datos: columnas 'alias' y 'nombre'
+# (una fila por variante de escritura -> nombre canónico del jugador).
+ARCHIVO_ALIAS = "alias.csv"
+
+
+def normalizar_texto(s):
+    if pd.isna(s):
+        return ""
+    s = str(s).strip().lower()
+    s = " ".join(s.split())
+    s = "".join(c for c in unicodedata.normalize("NFD", s) if unicodedata.category(c) != "Mn")
+    return s.title()
+
+
+def leer_alias(ruta):
+    """{variante normalizada: nombre canónico normalizado}. Vacío si no existe el archivo."""
+    if not ruta or not os.path.exists(ruta):
+        return {}
+    df = pd.read_csv(ruta, dtype=str)
+    df.columns = df.columns.str.strip().str.lower()
+    alias = {}
+    for variante, nombre in zip(df["alias"].tolist(), df["nombre"].tolist()):
+        variante, nombre = normalizar_texto(variante), normalizar_texto(nombre)
+        if variante and nombre and variante != nombre:
+            alias[variante] = nombre
+    return alias
+
+
+# Índice canónico de jugadores: cada texto crudo distinto se normaliza una sola
+# vez (memo) y se le asigna un id entero estable. Las agrupaciones y cruces se
+# hacen sobre esos ids; los nombres solo se recuperan al final para mostrar.
+class IndiceJugadores:
+    def __init__(self, alias=None):
+        self._lock = threading.Lock()
+        self.nombres = []     # id -> nombre canónico
+        self._ids = {}        # nombre canónico -> id
+        self._memo = {}       # texto crudo -> id (-1 = sin nombre)
+        self.alias = {}
+        if alias:
+            self.definir_alias(alias)
+
+    def definir_alias(self, alias):
+        # Los ids ya asignados a nombres canónicos no cambian; solo se olvida el memo
+        with self._lock:
+            self.alias = dict(alias)
+            self._memo.clear()
+
+    def _id(self, crudo):
+        id_jugador = self._memo.get(crudo)
+        if id_jugador is None:
+            nombre = normalizar_texto(crudo)
+            nombre = self.alias.get(nombre, nombre)
+            if not nombre:
+                id_jugador = -1
+            else:
+                id_jugador = self._ids.get(nombre)
+                if id_jugador is None:
+                    id_jugador = self._ids[nombre] = len(self.nombres)
+                    self.nombres.append(nombre)
+            self._memo[crudo] = id_jugador
+        return id_jugador
+
+    def ids(self, serie):
+        """Ids (int32) de una Serie de nombres crudos; -1 para vacíos o NaN."""
+        codigos, unicos = pd.factorize(serie)
+        with self._lock:
+            mapa = np.array([self._id(u) for u in unicos] + [-1], dtype=np.int32)
+        return mapa[codigos]
+
+    def nombres_de(self, ids):
+        """Nombres canónicos de un array de ids ('' para -1)."""
+        with self._lock:
+            tabla = np.array(self.nombres + [""], dtype=object)
+        ids = np.asarray(ids)
+        return tabla[np.where(ids >= 0, ids, len(tabla) - 1)]
+
+    def normalizar(self, serie):
+        """Serie de nombres canónicos (normalizados y con alias aplicados)."""
+        return pd.Series(self.nombres_de(self.ids(serie)), index=serie.index, name=serie.name, dtype=str)
@@ -0,0 +1,111 @@
+import contextvars
+import json
+import logging
+import os
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+
+# Medición por rerun: cada etapa (carga de archivo, hoja, figura, render...) se
+# registra en la medición activa del hilo, junto con aciertos/fallos de cada
+# cache. Al terminar el rerun se escribe una línea JSON en el log de rendimiento.
+# DASHBOARD_PERF_LOG: "0" = apagado (por defecto), "" / "-" = stderr, otra cosa = archivo.
+# Apagado, se escribe igual a stderr cuando se pide (panel de rendimiento abierto).
+PERF_LOG = os.environ.get("DASHBOARD_PERF_LOG", "0")
+
+_actual = contextvars.ContextVar("medicion", default=None)
+_logger = logging.getLogger("dashboard.perf")
+
+
+def _configurar_logger():
+    if _logger.handlers:
+        return
+    handler = logging.StreamHandler(sys.stderr) if PERF_LOG in ("", "-", "0") else logging.FileHandler(PERF_LOG, encoding="utf-8")
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    _logger.addHandler(handler)
+    _logger.setLevel(logging.INFO)
+    _logger.propagate = False
+
+
+class Medicion:
+    def __init__(self, **contexto):
+        self.contexto = contexto
+        self.inicio = time.perf_counter()
+        self.etapas = []     # (nombre, segundos, extra)
+        self.caches = {}     # cache -> [aciertos, fallos]
+        self.segundos = None
+
+    def agregar(self, nombre, segundos, **extra):
+        self.etapas.append((nombre, segundos, extra))
+
+    def contar(self, cache, acierto):
+        par = self.caches.setdefault(cache, [0, 0])
+        par[0 if acierto else 1] += 1
+
+    def como_dict(self):
+        return {
+            "fecha": datetime.now().isoformat(timespec="seconds"),
+            **self.contexto,
+            "segundos": round(self.segundos if self.segundos is not None else time.perf_counter() - self.inicio, 4),
+            "etapas": [{"etapa": n, "segundos": round(s, 4), **extra} for n, s, extra in self.etapas],
+            "caches": {c: {"aciertos": a, "fallos": f} for c, (a, f) in self.caches.items()},
+        }
+
+
+def iniciar(**contexto):
+    """Arranca una medición nueva para este hilo (un rerun, un informe, ...)."""
+    medicion = Medicion(**contexto)
+    _actual.set(medicion)
+    return medicion
+
+
+def actual():
+    return _actual.get()
+
+
+def terminar(medicion=None, forzar=False):
+    """Cierra la medición, escribe su línea JSON (si el log está prendido o `forzar`) y la devuelve."""
+    medicion = medicion or _actual.get()
+    if medicion is None:
+        return None
+    medicion.segundos = time.perf_counter() - medicion.inicio
+    if _actual.get() is medicion:
+        _actual.set(None)
+    registrar(medicion.como_dict(), forzar)
+    return medicion
+
+
+def registrar(evento, forzar=False):
+    if PERF_LOG == "0" and not forzar:
+        return
+    _configurar_logger()
+    _logger.info(json.dumps(evento, ensure_ascii=False, default=str))
+
+
+@contextmanager
+def etapa(nombre, **extra):
+    """Mide el bloque y lo agrega a la medición activa (sin medición activa no hace nada)."""
+    medicion = _actual.get()
+    if medicion is None:
+        yield
+        return
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        medicion.agregar(nombre, time.perf_counter() - t0, **extra)
+
+
+def agregar(nombre, segundos, **extra):
+    """Agrega una etapa ya medida (por ejemplo en otro proceso) a la medición activa."""
+    medicion = _actual.get()
+    if medicion is not None:
+        medicion.agregar(nombre, segundos, **extra)
+
+
+def contar(cache, acierto):
+    medicion = _actual.get()
+    if medicion is not None:
+        medicion.contar(cache, acierto)
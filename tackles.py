@@ -0,0 +1,104 @@
+import numpy as np
+import pandas as pd
+
+from jugadores import normalizar_texto  # noqa: F401
+
+
+COLUMNAS_TACKLES = ["tackles", "errados", "positivos", "neutrales", "negativos"]
+
+
+def preparar_partido(resumen):
+    """Planilla de un partido para los gráficos: camisetas 1-25 con nombre, total, % y etiqueta."""
+    jugadores_completos = pd.DataFrame({"jugador": list(map(str, range(1, 26)))})
+    resumen = resumen.copy()
+    resumen["jugador"] = resumen["jugador"].astype(str)
+    resumen = jugadores_completos.merge(resumen, on="jugador", how="left")
+    resumen["nombre del jugador"] = resumen["nombre del jugador"].fillna("")
+    resumen["nombre completo"] = resumen["nombre del jugador"] + " (" + resumen["jugador"] + ")"
+    resumen = resumen[resumen["nombre del jugador"] != ""]
+    for col in COLUMNAS_TACKLES:
+        resumen[col] = resumen[col].fillna(0).astype(int)
+    resumen["total"] = resumen["tackles"] + resumen["errados"]
+    jugados = resumen["total"] > 0
+    resumen["porcentaje"] = (resumen["tackles"] / resumen["total"].where(jugados) * 100).fillna(0).round(0).astype(int)
+    resumen["etiqueta"] = np.where(
+        jugados,
+        resumen["tackles"].astype(str) + "/" + resumen["total"].astype(str) + " (" + resumen["porcentaje"].astype(str) + "%)",
+        "",
+    )
+    return resumen
+
+
+def resumen_de_hechos(filas):
+    """Filas de la tabla de hechos de un partido con las columnas de la hoja 'Resumen' (para preparar_partido)."""
+    resumen = pd.DataFrame({
+        "jugador": filas["camiseta"].astype("Int64").astype(str),
+        "nombre del jugador": filas["nombre del jugador"].astype(str),
+    })
+    for col in COLUMNAS_TACKLES:
+        resumen[col] = filas[col].astype(int)
+    return resumen.reset_index(drop=True)
+
+
+def texto_barras_partido(df_plot):
+    """Etiqueta de cada barra del gráfico por partido (en la de errados solo si no hubo tackles)."""
+    con_valor = df_plot["cantidad"] > 0
+    mostrar = con_valor & ((df_plot["resultado"] == "tackles") |
+                           ((df_plot["resultado"] == "errados") & df_plot["etiqueta"].str.startswith("0/")))
+    return df_plot["etiqueta"].where(mostrar, "")
+
+
+# Filas de totales que trae cada hoja 'Resumen' al pie (no son jugadores)
+ETIQUETAS_RESUMEN = ["positivos", "neutrales", "negativos", "errados"]
+MAX_CONTADOR = np.iinfo(np.uint16).max
+
+# Esquema de la tabla de hechos: una fila por jugador y partido
+ESQUEMA_HECHOS = {
+    "partido": "category",
+    "id_jugador": "int32",
+    "nombre del jugador": "category",
+    "camiseta": "UInt8",
+    **{col: "uint16" for col in COLUMNAS_TACKLES},
+}
+
+
+def filas_partido(resumen):
+    """Valida la hoja 'Resumen' y la reduce a camiseta + contadores con tipos chicos.
+
+    Devuelve (filas, nombres crudos). Lanza ValueError si faltan columnas o hay valores inválidos.
+    """
+    faltan = [col for col in ["jugador"] + COLUMNAS_TACKLES if col not in resumen.columns]
+    if faltan:
+        raise ValueError(f"faltan columnas en 'Resumen': {', '.join(faltan)}")
+    jugador = resumen["jugador"].astype(str).str.strip()
+    es_jugador = ~jugador.str.lower().isin(ETIQUETAS_RESUMEN).to_numpy()
+
+    crudos = resumen.loc[es_jugador, COLUMNAS_TACKLES]
+    contadores = crudos.apply(pd.to_numeric, errors="coerce")
+    invalidos = (contadores.isna() & crudos.notna()) | (contadores < 0) | (contadores > MAX_CONTADOR)
+    if invalidos.any().any():
+        col = invalidos.any().idxmax()
+        raise ValueError(f"valores inválidos en la columna '{col}' de 'Resumen'")
+
+    camiseta = pd.to_numeric(jugador[es_jugador], errors="coerce")
+    camiseta = camiseta.where(camiseta.between(0, 255) & (camiseta % 1 == 0))
+    filas = contadores.fillna(0).astype("uint16")
+    filas.insert(0, "camiseta", camiseta.astype("UInt8"))
+    filas = filas.reset_index(drop=True)
+    if "nombre del jugador" in resumen.columns:
+        nombres = resumen.loc[es_jugador, "nombre del jugador"].to_numpy(dtype=object)
+    else:
+        nombres = np.full(len(filas), np.nan, dtype=object)
+    return filas, nombres
+
+
+def completar_sumado(df):
+    """Totales por jugador (id_jugador, nombre, contadores, PJ) -> df_sumado con total, % y etiqueta."""
+    df = df.sort_values("nombre del jugador")
+    df["total"] = df["tackles"] + df["errados"]
+    df["porcentaje"] = (df["tackles"] / df["total"] * 100).round(1)
+    df["etiqueta"] = (
+        df["tackles"].astype(str) + "/" + df["total"].astype(str) + " (" +
+        df["porcentaje"].astype(str) + "%) – " + df["PJ"].astype(str) + " PJ"
+    )
+    return df.sort_values("total", ascending=False)